@@ -1,14 +1,41 @@
 from dataclasses import dataclass, field
+from pathlib import Path
 from typing import Optional
-import logging
+import json, logging
 
 logger = logging.getLogger(__name__)
 
 from config.settings import (
     VENUES, TOSS_FIELD_WIN_BOOST, TOURNAMENT_STAGE_RUN_MULTIPLIER,
     STAR_BATTER_ABSENCE_RUN_PENALTY, STAR_BOWLER_ABSENCE_WICKET_BOOST,
+    GENERATED_SETTINGS_PATH,
 )
 
+_registry_cache = {}
+
+def venue_registry(path: Optional[Path] = None):
+    """
+    (venues, toss_field_win_boost): the config dicts with the data-derived
+    fields from build_models.py's generated settings (path, default
+    GENERATED_SETTINGS_PATH) laid over them. City, coordinates and dew risk
+    stay hand-maintained. Re-read when the file changes, so a long-running
+    process picks up a mid-season build.
+    """
+    path  = Path(path or GENERATED_SETTINGS_PATH)
+    mtime = path.stat().st_mtime_ns if path.exists() else None
+    key   = (str(path), mtime)
+    if key not in _registry_cache:
+        venues     = {name: dict(data) for name, data in VENUES.items()}
+        toss_boost = dict(TOSS_FIELD_WIN_BOOST)
+        if mtime is not None:
+            generated = json.loads(path.read_text())
+            for name, data in generated.get("venues", {}).items():
+                venues.setdefault(name, {}).update(data)
+            toss_boost.update(generated.get("toss_field_win_boost", {}))
+        _registry_cache.clear()
+        _registry_cache[key] = (venues, toss_boost)
+    return _registry_cache[key]
+
 @dataclass
 class PlayerAbsence:
     name: str
@@ -44,7 +71,8 @@ def build_match_context(venue, team_batting_first, team_batting_second,
         toss_decision=toss_decision, match_time=match_time,
         tournament_stage=tournament_stage, absent_players=absent_players,
     )
-    venue_data = VENUES.get(venue, {})
+    venues, toss_boost = venue_registry()
+    venue_data = venues.get(venue, {})
     if not venue_data:
         logger.warning(f"Venue '{venue}' not in registry. Using defaults.")
 
@@ -54,7 +82,7 @@ def build_match_context(venue, team_batting_first, team_batting_second,
     ctx.dew_risk            = venue_data.get("dew_risk", 0.40)
 
     ctx.toss_win_prob_boost = (
-        TOSS_FIELD_WIN_BOOST.get(venue, TOSS_FIELD_WIN_BOOST["default"])
+        toss_boost.get(venue, toss_boost["default"])
         if toss_decision == "field" else 0.0
     )
 
@@ -0,0 +1,248 @@
+"""
+Historical model tables built from balls_df.
+
+over_progression()/session_table() are the batch builders. ModelState keeps
+the venue, toss and session models as running statistics that are updated
+one match at a time, and renders the generated settings the context engine
+reads in place of the hand-copied VENUES / TOSS_FIELD_WIN_BOOST numbers.
+"""
+import json, math
+from dataclasses import dataclass
+from pathlib import Path
+import numpy as np
+import pandas as pd
+
+from config.settings import GENERATED_SETTINGS_PATH, MODEL_STATE_PATH
+
+MAX_OVERS             = 20
+STATE_VERSION         = 1
+GENERATED_MIN_MATCHES = 10
+
+def over_progression(balls_df, innings=(1, 2)):
+    """
+    Cumulative runs and wickets at the end of every over (1-20) for each
+    match innings, in one vectorized pass: deliveries are binned into a
+    (match innings x over) matrix with bincount and summed along the overs.
+    Overs after an innings ended carry its final total forward.
+
+    Returns a long frame: match_id, venue, innings, over, runs, wickets.
+    """
+    balls = balls_df[balls_df["innings"].isin(innings) & (balls_df["over"] <= MAX_OVERS)]
+    keys  = ["match_id", "innings"]
+    group = balls.groupby(keys, sort=True, observed=True)
+    first = group["venue"].first().reset_index()
+    n     = len(first)
+
+    slot    = group.ngroup().to_numpy() * MAX_OVERS + balls["over"].to_numpy().astype(np.int64) - 1
+    runs    = np.bincount(slot, weights=balls["runs_total"].to_numpy(), minlength=n * MAX_OVERS)
+    wickets = np.bincount(slot, weights=balls["is_wicket"].to_numpy(), minlength=n * MAX_OVERS)
+
+    return pd.DataFrame({
+        "match_id": np.repeat(first["match_id"].to_numpy(), MAX_OVERS),
+        "venue":    first["venue"].repeat(MAX_OVERS).to_numpy(),
+        "innings":  np.repeat(first["innings"].to_numpy(), MAX_OVERS),
+        "over":     np.tile(np.arange(1, MAX_OVERS + 1, dtype=np.int8), n),
+        "runs":     runs.reshape(n, MAX_OVERS).cumsum(axis=1).ravel().astype(np.int16),
+        "wickets":  wickets.reshape(n, MAX_OVERS).cumsum(axis=1).ravel().astype(np.int8),
+    })
+
+def session_table(progression):
+    """Per-venue, per-innings, per-over mean/std of cumulative runs and wickets."""
+    return (
+        progression.groupby(["venue", "innings", "over"], observed=True)
+        .agg(mean_runs=("runs", "mean"), std_runs=("runs", "std"),
+             mean_wickets=("wickets", "mean"), std_wickets=("wickets", "std"),
+             match_count=("runs", "count"))
+        .reset_index()
+    )
+
+# ── Streaming model state ─────────────────────────────────────
+# Every model is kept as mergeable running statistics so a new match can be
+# folded in without touching history:
+#   RunningStat  count / mean / M2 (Welford), merged with Chan's formula
+#   win counts   [wins, matches]
+
+@dataclass
+class RunningStat:
+    count: int = 0
+    mean: float = 0.0
+    m2: float = 0.0
+
+    def add(self, x):
+        self.count += 1
+        delta      = x - self.mean
+        self.mean += delta / self.count
+        self.m2   += delta * (x - self.mean)
+
+    def merge(self, other):
+        if not other.count:
+            return self
+        total = self.count + other.count
+        delta = other.mean - self.mean
+        self.mean  += delta * other.count / total
+        self.m2    += other.m2 + delta * delta * self.count * other.count / total
+        self.count  = total
+        return self
+
+    @property
+    def std(self):
+        """Sample standard deviation (ddof=1), NaN below two observations — as pandas."""
+        return math.sqrt(self.m2 / (self.count - 1)) if self.count > 1 else float("nan")
+
+class ModelState:
+    """
+    Venue, toss and session models as running statistics:
+
+      venue_totals[venue]                    innings-1 totals
+      session_runs[(venue, innings, over)]   cumulative runs at end of over
+      session_wkts[(venue, innings, over)]   cumulative wickets at end of over
+      toss[(venue, decision)]                [toss winner won, decided matches]
+      chase[venue]                           [chasing side won, decided matches]
+    """
+
+    def __init__(self):
+        self.venue_totals = {}
+        self.session_runs = {}
+        self.session_wkts = {}
+        self.toss         = {}
+        self.chase        = {}
+        self.match_ids    = set()
+
+    def update(self, matches_df, balls_df):
+        """Folds in every match not yet seen, one at a time. Returns the number added."""
+        new_ids = set(matches_df["match_id"]) - self.match_ids
+        if not new_ids:
+            return 0
+        new_balls   = balls_df[balls_df["match_id"].isin(new_ids)]
+        progression = over_progression(new_balls)
+        chasers     = (new_balls[new_balls["innings"] == 2].groupby("match_id", observed=True)
+                       ["batting_team"].first().astype(str).to_dict())
+        by_match    = {m: g for m, g in progression.groupby("match_id", sort=False)}
+        for match_row in matches_df[matches_df["match_id"].isin(new_ids)].to_dict("records"):
+            match_id = match_row["match_id"]
+            self.add_match(match_row, by_match.get(match_id), chasers.get(match_id))
+        return len(new_ids)
+
+    def add_match(self, match_row, progression=None, chasing_team=None):
+        """progression: this match's over_progression() rows, if it has deliveries."""
+        venue  = str(match_row["venue"])
+        winner = match_row["winner"]
+        if progression is not None:
+            for innings, over, runs, wickets in progression[
+                    ["innings", "over", "runs", "wickets"]].itertuples(index=False):
+                key = (venue, int(innings), int(over))
+                self.session_runs.setdefault(key, RunningStat()).add(float(runs))
+                self.session_wkts.setdefault(key, RunningStat()).add(float(wickets))
+                if innings == 1 and over == MAX_OVERS:
+                    self.venue_totals.setdefault(venue, RunningStat()).add(float(runs))
+
+        decided = isinstance(winner, str) and winner != ""
+        if decided and match_row["toss_decision"] in ("bat", "field"):
+            tally = self.toss.setdefault((venue, match_row["toss_decision"]), [0, 0])
+            tally[0] += match_row["toss_winner"] == winner
+            tally[1] += 1
+        if chasing_team and winner in (match_row["team1"], match_row["team2"]):
+            tally = self.chase.setdefault(venue, [0, 0])
+            tally[0] += chasing_team == winner
+            tally[1] += 1
+        self.match_ids.add(match_row["match_id"])
+
+    def merge(self, other):
+        """Combines two states built from disjoint sets of matches."""
+        for mine, theirs in ((self.venue_totals, other.venue_totals),
+                             (self.session_runs, other.session_runs),
+                             (self.session_wkts, other.session_wkts)):
+            for key, stat in theirs.items():
+                mine.setdefault(key, RunningStat()).merge(stat)
+        for mine, theirs in ((self.toss, other.toss), (self.chase, other.chase)):
+            for key, (wins, n) in theirs.items():
+                tally = mine.setdefault(key, [0, 0])
+                tally[0] += wins
+                tally[1] += n
+        self.match_ids |= other.match_ids
+        return self
+
+    # ── model tables (same layout as the pandas builds) ─────────
+    def venue_model(self):
+        rows = [{"venue": v, "avg_runs": s.mean, "std_runs": s.std, "match_count": s.count}
+                for v, s in sorted(self.venue_totals.items())]
+        return pd.DataFrame(rows).sort_values("match_count", ascending=False)
+
+    def session_model(self):
+        rows = []
+        for key in sorted(self.session_runs):
+            runs, wkts = self.session_runs[key], self.session_wkts[key]
+            rows.append({"venue": key[0], "innings": key[1], "over": key[2],
+                         "mean_runs": runs.mean, "std_runs": runs.std,
+                         "mean_wickets": wkts.mean, "std_wickets": wkts.std,
+                         "match_count": runs.count})
+        return pd.DataFrame(rows)
+
+    def toss_model(self):
+        rows = [{"venue": v, "toss_decision": d, "win_rate": wins / n, "match_count": n}
+                for (v, d), (wins, n) in sorted(self.toss.items())]
+        return pd.DataFrame(rows).sort_values("win_rate", ascending=False)
+
+    def generated_settings(self, min_matches=GENERATED_MIN_MATCHES):
+        """
+        The data-derived parts of config.settings.VENUES and TOSS_FIELD_WIN_BOOST,
+        for venues with at least min_matches observations.
+        """
+        venues = {}
+        for venue, totals in self.venue_totals.items():
+            if totals.count < min_matches:
+                continue
+            entry = {"avg_first_innings_t20": round(totals.mean, 1)}
+            powerplay = self.session_runs.get((venue, 1, 6))
+            if powerplay:
+                entry["avg_powerplay_runs"] = round(powerplay.mean, 1)
+            wins, n = self.chase.get(venue, (0, 0))
+            if n >= min_matches:
+                entry["chase_advantage"] = round(wins / n, 3)
+            venues[venue] = entry
+        toss_boost = {v: round(wins / n - 0.5, 3) for (v, d), (wins, n) in self.toss.items()
+                      if d == "field" and n >= min_matches}
+        return {"matches": len(self.match_ids), "venues": venues,
+                "toss_field_win_boost": toss_boost}
+
+    # ── persistence ──────────────────────────────────────────
+    def save(self, path: Path = MODEL_STATE_PATH):
+        def stats(table):
+            return [[*key, s.count, s.mean, s.m2] if isinstance(key, tuple) else
+                    [key, s.count, s.mean, s.m2] for key, s in table.items()]
+        payload = {
+            "version":      STATE_VERSION,
+            "venue_totals": stats(self.venue_totals),
+            "session_runs": stats(self.session_runs),
+            "session_wkts": stats(self.session_wkts),
+            "toss":         [[v, d, w, n] for (v, d), (w, n) in self.toss.items()],
+            "chase":        [[v, w, n] for v, (w, n) in self.chase.items()],
+            "match_ids":    sorted(self.match_ids),
+        }
+        _write_json(Path(path), payload)
+
+    @classmethod
+    def load(cls, path: Path = MODEL_STATE_PATH):
+        """Loads a saved state; a missing or outdated file gives an empty one."""
+        state, path = cls(), Path(path)
+        if not path.exists():
+            return state
+        payload = json.loads(path.read_text())
+        if payload.get("version") != STATE_VERSION:
+            return state
+        state.venue_totals = {r[0]: RunningStat(*r[1:]) for r in payload["venue_totals"]}
+        state.session_runs = {tuple(r[:3]): RunningStat(*r[3:]) for r in payload["session_runs"]}
+        state.session_wkts = {tuple(r[:3]): RunningStat(*r[3:]) for r in payload["session_wkts"]}
+        state.toss         = {(v, d): [w, n] for v, d, w, n in payload["toss"]}
+        state.chase        = {v: [w, n] for v, w, n in payload["chase"]}
+        state.match_ids    = set(payload["match_ids"])
+        return state
+
+def write_generated_settings(state, path: Path = GENERATED_SETTINGS_PATH):
+    _write_json(Path(path), state.generated_settings())
+
+def _write_json(path, payload):
+    path.parent.mkdir(parents=True, exist_ok=True)
+    tmp = path.with_suffix(".tmp")
+    tmp.write_text(json.dumps(payload, indent=1))
+    tmp.replace(path)
@@ -1,43 +1,333 @@
 """
 Parses Cricsheet IPL JSON files into clean DataFrames.
 One row per match in matches_df, one row per delivery in balls_df.
+
+The source is either a directory of extracted JSON files or the Cricsheet
+zip itself; archive members are streamed and decoded in memory, so nothing
+has to be extracted to disk first.
+
+Parsing is serial by default. Pass workers > 1 to spread fixed-size chunks
+of files over a process pool; chunks are merged back in sorted file order,
+so the output is identical to the serial path.
+
+Pass cache_dir to keep a manifest (mtime, size and a content hash per file)
+next to the parsed frames. Later loads only parse new or changed files and
+take the rest from the cache.
+
+balls_df is compact: names are interned while parsing and come back as
+categoricals over shared, sorted dictionaries (batter and bowler share one
+player dictionary), and per-ball counts are int8.
+
+Parse throughput for the files actually parsed (cache hits excluded) is
+printed and kept on balls_df.attrs["parse_stats"].
 """
-import json
-from pathlib import Path
+import json, hashlib, time, zipfile
+from array import array
+from concurrent.futures import ProcessPoolExecutor
+from dataclasses import dataclass, asdict
+from pathlib import Path, PurePosixPath
+import numpy as np
 import pandas as pd
 from tqdm import tqdm
 
-def load_all_matches(json_dir: Path):
-    json_files = sorted(json_dir.glob("*.json"))
-    if not json_files:
+CHUNK_SIZE = 32
+MANIFEST_VERSION = 3
+
+# Categorical ball columns -> the dictionary they are coded against
+BALL_VOCABS = {
+    "date":         "dates",
+    "season":       "seasons",
+    "venue":        "venues",
+    "batting_team": "teams",
+    "batter":       "players",
+    "bowler":       "players",
+    "wicket_kind":  "wicket_kinds",
+}
+BALL_COLUMNS = [
+    "match_id", "date", "season", "venue", "innings", "batting_team", "over", "ball",
+    "batter", "bowler", "runs_batter", "runs_extras", "runs_total", "is_wicket", "wicket_kind",
+]
+BALL_INT8_COLUMNS = ["innings", "over", "ball", "runs_batter", "runs_extras", "runs_total", "is_wicket"]
+
+@dataclass
+class ParseStats:
+    files: int = 0
+    deliveries: int = 0
+    seconds: float = 0.0
+
+    @property
+    def deliveries_per_sec(self):
+        return self.deliveries / self.seconds if self.seconds else 0.0
+
+def load_all_matches(source: Path, workers: int = 1, chunk_size: int = CHUNK_SIZE,
+                     cache_dir: Path = None):
+    """source: a directory of Cricsheet JSON files or a Cricsheet .zip archive."""
+    source = _MatchSource(source)
+    names  = source.names()
+    if not names:
         raise FileNotFoundError(
-            f"No JSON files in {json_dir}. Run: python scripts/download_cricsheet.py"
+            f"No JSON files in {source.path}. Run: python scripts/download_cricsheet.py"
         )
-    print(f"Parsing {len(json_files)} match files...")
-    all_matches, all_balls = [], []
-    for filepath in tqdm(json_files, desc="Parsing"):
-        try:
-            match_row, ball_rows = _parse_match(filepath)
-            if match_row:
-                all_matches.append(match_row)
-                all_balls.extend(ball_rows)
-        except Exception as e:
-            print(f"  Skipping {filepath.name}: {e}")
-
-    matches_df = pd.DataFrame(all_matches)
-    balls_df   = pd.DataFrame(all_balls)
+    stats = ParseStats()
+    if cache_dir is None:
+        print(f"Parsing {len(names)} match files...")
+        matches_df, balls_df = _parse_files(source, names, workers, chunk_size, stats)
+    else:
+        matches_df, balls_df = _load_incremental(source, names, Path(cache_dir), workers,
+                                                 chunk_size, stats)
     print(f"Loaded {len(matches_df)} matches, {len(balls_df):,} deliveries.")
+    if stats.files:
+        print(f"Parsed {stats.deliveries:,} deliveries from {stats.files} files in "
+              f"{stats.seconds:.2f}s ({stats.deliveries_per_sec:,.0f} deliveries/s).")
+    balls_df.attrs["parse_stats"] = asdict(stats) | {"deliveries_per_sec": stats.deliveries_per_sec}
     return matches_df, balls_df
 
-def _parse_match(filepath):
-    with open(filepath, encoding="utf-8") as f:
-        raw = json.load(f)
+class _MatchSource:
+    """Uniform name listing, fingerprinting and reading over a directory or a zip."""
+
+    def __init__(self, path):
+        self.path       = Path(path)
+        self.is_archive = self.path.is_file() and zipfile.is_zipfile(self.path)
+        self._infos     = None
+
+    def names(self):
+        if not self.is_archive:
+            return sorted(p.name for p in self.path.glob("*.json"))
+        with zipfile.ZipFile(self.path) as zf:
+            self._infos = {i.filename: i for i in zf.infolist()
+                           if i.filename.endswith(".json") and not i.is_dir()}
+        return sorted(self._infos)
+
+    def fingerprint(self, name, known, force=False):
+        """
+        Returns the manifest entry for `name` if it matches `known`, else None.
+        Directory files compare size and mtime first and only hash the content
+        when those differ, so a touched-but-identical file is not re-parsed.
+        Archive members carry their CRC-32, so nothing is read at all.
+        """
+        if self.is_archive:
+            info  = self._infos[name]
+            entry = {"date_time": list(info.date_time), "size": info.file_size, "crc32": info.CRC}
+            return entry if force or entry == known else None
+        stat  = (self.path / name).stat()
+        entry = {"mtime_ns": stat.st_mtime_ns, "size": stat.st_size}
+        if (known and not force and known.get("mtime_ns") == entry["mtime_ns"]
+                and known.get("size") == entry["size"]):
+            return known
+        entry["sha1"] = hashlib.sha1((self.path / name).read_bytes()).hexdigest()
+        if force or (known and known.get("sha1") == entry["sha1"]):
+            return entry
+        return None
+
+def _parse_files(source, names, workers, chunk_size, stats):
+    started = time.perf_counter()
+    chunks = [names[i:i + chunk_size] for i in range(0, len(names), chunk_size)]
+    tasks  = [(source.path, source.is_archive, chunk) for chunk in chunks]
+    all_matches, ball_parts = [], []
+    with tqdm(total=len(names), desc="Parsing") as bar:
+        for chunk, (match_rows, ball_part, skipped) in zip(chunks, _map_chunks(tasks, workers)):
+            for name, error in skipped:
+                print(f"  Skipping {name}: {error}")
+            all_matches.extend(match_rows)
+            ball_parts.append(ball_part)
+            bar.update(len(chunk))
+
+    balls_df = _merge_ball_parts(ball_parts)
+    stats.files      += len(names)
+    stats.deliveries += len(balls_df)
+    stats.seconds    += time.perf_counter() - started
+    return pd.DataFrame(all_matches), balls_df
+
+def _merge_ball_parts(parts):
+    """
+    Concatenates (codes_df, vocabs) parts into one balls_df. Each part codes
+    its names against its own dictionaries; they are re-coded onto sorted
+    union dictionaries so the result does not depend on chunking.
+    """
+    parts = [(codes, vocabs) for codes, vocabs in parts if len(codes)]
+    if not parts:
+        return pd.DataFrame()
+    merged = {}
+    for vocab in set(BALL_VOCABS.values()):
+        merged[vocab] = sorted(set().union(*(vocabs[vocab] for _, vocabs in parts)))
+    lookups = []
+    for _, vocabs in parts:
+        lookups.append({vocab: np.searchsorted(merged[vocab], values).astype(np.int32)
+                        for vocab, values in vocabs.items()})
+    balls_df = pd.concat([codes for codes, _ in parts], ignore_index=True)
+    for column, vocab in BALL_VOCABS.items():
+        recoded = np.concatenate([lookup[vocab][codes[column].to_numpy()]
+                                  for (codes, _), lookup in zip(parts, lookups)])
+        balls_df[column] = pd.Categorical.from_codes(recoded, categories=merged[vocab])
+    return balls_df
+
+def _as_ball_part(balls_df):
+    """Splits a merged balls_df back into a (codes_df, vocabs) part."""
+    codes, vocabs = balls_df.copy(), {}
+    for column, vocab in BALL_VOCABS.items():
+        # Columns sharing a dictionary already carry identical categories
+        vocabs[vocab] = list(balls_df[column].cat.categories)
+        codes[column] = balls_df[column].cat.codes.to_numpy()
+    return codes, vocabs
+
+def _load_incremental(source, names, cache_dir, workers, chunk_size, stats):
+    manifest = _read_manifest(cache_dir)
+    cached_matches, cached_balls = _read_cached_frames(cache_dir)
+    cached_ids = set(cached_matches["match_id"]) if len(cached_matches) else set()
+
+    entries, stale = {}, []
+    for name in names:
+        entry = source.fingerprint(name, manifest.get(name))
+        if entry is None or _match_id(name) not in cached_ids:
+            stale.append(name)
+        else:
+            entries[name] = entry
+    print(f"Parsing {len(stale)} new/changed of {len(names)} match files "
+          f"({len(entries)} cached)...")
+
+    keep_ids = {_match_id(name) for name in entries}
+    frames   = [(cached_matches[cached_matches["match_id"].isin(keep_ids)],
+                 cached_balls[cached_balls["match_id"].isin(keep_ids)])] if cached_ids else []
+    if stale:
+        new_matches, new_balls = _parse_files(source, stale, workers, chunk_size, stats)
+        frames.append((new_matches, new_balls))
+        parsed_ids = set(new_matches["match_id"]) if len(new_matches) else set()
+        for name in stale:
+            if _match_id(name) in parsed_ids:
+                entries[name] = source.fingerprint(name, None, force=True)
+
+    order      = {_match_id(name): i for i, name in enumerate(names)}
+    matches_df = _in_file_order(_concat([m for m, _ in frames]), order)
+    balls_df   = _in_file_order(_merge_ball_parts([_as_ball_part(b) for _, b in frames if len(b)]),
+                                order)
+    if entries != manifest:
+        _write_cache(cache_dir, entries, matches_df, balls_df)
+    return matches_df, balls_df
+
+def _concat(frames):
+    frames = [f for f in frames if len(f)]
+    return pd.concat(frames, ignore_index=True) if frames else pd.DataFrame()
+
+def _match_id(name):
+    return PurePosixPath(name).stem
+
+def _in_file_order(df, order):
+    if not len(df):
+        return df
+    key = df["match_id"].map(order)
+    return df.iloc[key.argsort(kind="stable")].reset_index(drop=True)
+
+def _read_manifest(cache_dir):
+    path = cache_dir / "manifest.json"
+    if not path.exists():
+        return {}
+    manifest = json.loads(path.read_text())
+    if manifest.get("version") != MANIFEST_VERSION:
+        return {}
+    return manifest["files"]
+
+def _read_cached_frames(cache_dir):
+    try:
+        return (pd.read_pickle(cache_dir / "matches.pkl"),
+                pd.read_pickle(cache_dir / "balls.pkl"))
+    except (FileNotFoundError, EOFError):
+        return pd.DataFrame(), pd.DataFrame()
+
+def _write_cache(cache_dir, entries, matches_df, balls_df):
+    cache_dir.mkdir(parents=True, exist_ok=True)
+    matches_df.to_pickle(cache_dir / "matches.pkl")
+    balls_df.to_pickle(cache_dir / "balls.pkl")
+    # Manifest last: a crash mid-write leaves stale entries, never missing frames
+    tmp = cache_dir / "manifest.json.tmp"
+    tmp.write_text(json.dumps({"version": MANIFEST_VERSION, "files": entries}, indent=0))
+    tmp.replace(cache_dir / "manifest.json")
+
+def _map_chunks(tasks, workers):
+    """Yields parsed chunks in input order, in-process or from a process pool."""
+    if not workers or workers <= 1:
+        yield from map(_parse_chunk, tasks)
+        return
+    with ProcessPoolExecutor(max_workers=workers) as pool:
+        yield from pool.map(_parse_chunk, tasks)
+
+class _Interner(dict):
+    """Maps each distinct string to a dense code in first-seen order."""
+
+    def code(self, value):
+        code = self.get(value)
+        if code is None:
+            code = self[value] = len(self)
+        return code
+
+    def truncate(self, size):
+        while len(self) > size:
+            self.popitem()
+
+class _BallColumns:
+    """
+    Struct-of-arrays delivery builder for one chunk: each ball column is a
+    typed array appended to while walking innings -> overs -> deliveries,
+    and the frame is assembled once in to_part(). Per-match and per-innings
+    constants are written in bulk rather than per ball.
+    """
+
+    def __init__(self):
+        self.match_ids, self.match_sizes = [], []
+        self.arrays = {c: array("b") for c in BALL_INT8_COLUMNS}
+        self.arrays.update({c: array("i") for c in BALL_VOCABS})
+        self.vocabs = {vocab: _Interner() for vocab in set(BALL_VOCABS.values())}
+
+    def __len__(self):
+        return len(self.arrays["over"])
+
+    def checkpoint(self):
+        return len(self), {vocab: len(i) for vocab, i in self.vocabs.items()}
+
+    def rollback(self, checkpoint):
+        """Drops everything appended since checkpoint() — used when a file fails mid-parse."""
+        size, vocab_sizes = checkpoint
+        for arr in self.arrays.values():
+            del arr[size:]
+        for vocab, n in vocab_sizes.items():
+            self.vocabs[vocab].truncate(n)
+
+    def to_part(self):
+        columns = {"match_id": np.repeat(np.array(self.match_ids, dtype=object), self.match_sizes)}
+        for column in BALL_COLUMNS[1:]:
+            dtype = np.int8 if column in BALL_INT8_COLUMNS else np.int32
+            columns[column] = np.frombuffer(self.arrays[column], dtype=dtype)
+        return pd.DataFrame(columns), {vocab: list(i) for vocab, i in self.vocabs.items()}
+
+def _parse_chunk(task):
+    path, is_archive, names = task
+    match_rows, skipped = [], []
+    balls   = _BallColumns()
+    archive = zipfile.ZipFile(path) if is_archive else None
+    try:
+        for name in names:
+            checkpoint = balls.checkpoint()
+            try:
+                with (archive.open(name) if archive else open(path / name, "rb")) as f:
+                    match_row = _parse_match(_match_id(name), f, balls)
+                if match_row:
+                    match_rows.append(match_row)
+            except Exception as e:
+                balls.rollback(checkpoint)
+                skipped.append((name, str(e)))
+    finally:
+        if archive:
+            archive.close()
+    return match_rows, balls.to_part(), skipped
+
+def _parse_match(match_id, f, balls):
+    """Returns the match row and appends every delivery to the `balls` builder."""
+    raw     = json.load(f)
     info    = raw.get("info", {})
     teams   = info.get("teams", ["Unknown", "Unknown"])
     toss    = info.get("toss", {})
     outcome = info.get("outcome", {})
     match_row = {
-        "match_id":       filepath.stem,
+        "match_id":       match_id,
         "date":           info.get("dates", [""])[0],
         "season":         str(info.get("season", "")),
         "venue":          info.get("venue", "Unknown"),
@@ -49,29 +339,42 @@ def _parse_match(filepath):
         "win_by_runs":    outcome.get("by", {}).get("runs", 0),
         "win_by_wickets": outcome.get("by", {}).get("wickets", 0),
     }
-    ball_rows = []
+    cols, vocabs = balls.arrays, balls.vocabs
+    player, kind = vocabs["players"].code, vocabs["wicket_kinds"].code
+    over_col, ball_col           = cols["over"].append, cols["ball"].append
+    batter_col, bowler_col       = cols["batter"].append, cols["bowler"].append
+    runs_bat, runs_ext, runs_tot = (cols["runs_batter"].append, cols["runs_extras"].append,
+                                    cols["runs_total"].append)
+    wicket_col, kind_col         = cols["is_wicket"].append, cols["wicket_kind"].append
+
+    start = len(balls)
     for inn_idx, innings in enumerate(raw.get("innings", [])):
-        batting_team = innings.get("team", "")
+        inn_start    = len(balls)
+        batting_team = vocabs["teams"].code(innings.get("team", ""))
         for over_obj in innings.get("overs", []):
-            over_num = over_obj.get("over", 0)
-            for ball_idx, delivery in enumerate(over_obj.get("deliveries", [])):
+            over_num = over_obj.get("over", 0) + 1
+            for ball_idx, delivery in enumerate(over_obj.get("deliveries", []), start=1):
                 runs_obj = delivery.get("runs", {})
                 wickets  = delivery.get("wickets", [])
-                ball_rows.append({
-                    "match_id":     filepath.stem,
-                    "date":         match_row["date"],
-                    "season":       match_row["season"],
-                    "venue":        match_row["venue"],
-                    "innings":      inn_idx + 1,
-                    "batting_team": batting_team,
-                    "over":         over_num + 1,
-                    "ball":         ball_idx + 1,
-                    "batter":       delivery.get("batter", ""),
-                    "bowler":       delivery.get("bowler", ""),
-                    "runs_batter":  runs_obj.get("batter", 0),
-                    "runs_extras":  runs_obj.get("extras", 0),
-                    "runs_total":   runs_obj.get("total", 0),
-                    "is_wicket":    1 if wickets else 0,
-                    "wicket_kind":  wickets[0].get("kind", "") if wickets else "",
-                })
-    return match_row, ball_rows
+                over_col(over_num)
+                ball_col(ball_idx)
+                batter_col(player(delivery.get("batter", "")))
+                bowler_col(player(delivery.get("bowler", "")))
+                runs_bat(runs_obj.get("batter", 0))
+                runs_ext(runs_obj.get("extras", 0))
+                runs_tot(runs_obj.get("total", 0))
+                wicket_col(1 if wickets else 0)
+                kind_col(kind(wickets[0].get("kind", "") if wickets else ""))
+        n = len(balls) - inn_start
+        cols["innings"].extend(array("b", [inn_idx + 1]) * n)
+        cols["batting_team"].extend(array("i", [batting_team]) * n)
+
+    n = len(balls) - start
+    for column, vocab, value in (("date", "dates", match_row["date"]),
+                                 ("season", "seasons", match_row["season"]),
+                                 ("venue", "venues", match_row["venue"])):
+        cols[column].extend(array("i", [vocabs[vocab].code(value)]) * n)
+    if n:
+        balls.match_ids.append(match_id)
+        balls.match_sizes.append(n)
+    return match_row
@@ -0,0 +1,198 @@
+"""
+Columnar store for parsed Cricsheet data.
+
+Matches and deliveries are written as Parquet datasets partitioned by season
+(hive layout: store/balls/season=2023/part-0.parquet) with typed columns:
+names are dictionary-encoded, counts are int8/int16, dates are date32.
+
+Loaders take a column projection plus season/venue/batter filters. Season
+filters prune whole partitions; venue and batter filters are pushed into the
+Parquet scan, so consumers only read the row groups and columns they need.
+
+For backtesting and replay, write_ball_arrays() also saves the fixed-width
+ball columns as one .npy file each, plus a match_id -> (start, end) offset
+index. BallArrays memory-maps them: slicing a match is an O(1), zero-copy
+view, and every process that opens the store shares the same page cache
+instead of holding its own copy.
+"""
+import json, shutil
+from pathlib import Path
+import numpy as np
+import pandas as pd
+
+try:
+    import pyarrow as pa
+    import pyarrow.dataset as ds
+except ImportError:
+    pa = ds = None
+
+from config.settings import BALL_ARRAYS_DIR, DATA_STORE
+
+ARRAY_COLUMNS = {
+    "innings":      np.int8,
+    "over":         np.int8,
+    "ball":         np.int8,
+    "runs_batter":  np.int8,
+    "runs_extras":  np.int8,
+    "runs_total":   np.int8,
+    "is_wicket":    np.int8,
+    "batting_team": np.int32,
+    "batter":       np.int32,
+    "bowler":       np.int32,
+}
+# Coded columns -> name of the vocabulary file their codes index into
+ARRAY_VOCABS = {"batting_team": "teams", "batter": "players", "bowler": "players"}
+
+def _schemas():
+    name  = pa.dictionary(pa.int32(), pa.string())
+    balls = pa.schema([
+        ("match_id",     pa.string()),
+        ("date",         pa.date32()),
+        ("season",       pa.string()),
+        ("venue",        name),
+        ("innings",      pa.int8()),
+        ("batting_team", name),
+        ("over",         pa.int8()),
+        ("ball",         pa.int8()),
+        ("batter",       name),
+        ("bowler",       name),
+        ("runs_batter",  pa.int8()),
+        ("runs_extras",  pa.int8()),
+        ("runs_total",   pa.int8()),
+        ("is_wicket",    pa.int8()),
+        ("wicket_kind",  name),
+    ])
+    matches = pa.schema([
+        ("match_id",       pa.string()),
+        ("date",           pa.date32()),
+        ("season",         pa.string()),
+        ("venue",          name),
+        ("team1",          name),
+        ("team2",          name),
+        ("toss_winner",    name),
+        ("toss_decision",  name),
+        ("winner",         name),
+        ("win_by_runs",    pa.int16()),
+        ("win_by_wickets", pa.int8()),
+    ])
+    return {"balls": balls, "matches": matches}
+
+def _require_pyarrow():
+    if pa is None:
+        raise ImportError("The Parquet store needs pyarrow: pip install pyarrow")
+
+def _partitioning():
+    return ds.partitioning(pa.schema([("season", pa.string())]), flavor="hive")
+
+def write_store(matches_df, balls_df, store_dir: Path = DATA_STORE):
+    """Replaces the season-partitioned matches and balls datasets under store_dir."""
+    _require_pyarrow()
+    schemas = _schemas()
+    for name, df in (("matches", matches_df), ("balls", balls_df)):
+        table  = pa.Table.from_pandas(df, preserve_index=False).cast(schemas[name])
+        target = Path(store_dir) / name
+        if target.exists():
+            shutil.rmtree(target)
+        ds.write_dataset(table, target, format="parquet", partitioning=_partitioning())
+
+def load_balls(columns=None, seasons=None, venues=None, batters=None,
+               store_dir: Path = DATA_STORE) -> pd.DataFrame:
+    """
+    Reads deliveries from the store. columns=None reads every column;
+    seasons/venues/batters are iterables of exact values to keep.
+    """
+    return _load("balls", columns, {"season": seasons, "venue": venues, "batter": batters},
+                 store_dir)
+
+def load_matches(columns=None, seasons=None, venues=None,
+                 store_dir: Path = DATA_STORE) -> pd.DataFrame:
+    return _load("matches", columns, {"season": seasons, "venue": venues}, store_dir)
+
+def _load(name, columns, filters, store_dir):
+    _require_pyarrow()
+    path = Path(store_dir) / name
+    if not path.exists():
+        raise FileNotFoundError(f"No {name} store at {path}. Run: python scripts/build_models.py")
+    dataset = ds.dataset(path, format="parquet", partitioning=_partitioning())
+    expr = None
+    for column, values in filters.items():
+        if values is None:
+            continue
+        if isinstance(values, str):
+            values = [values]
+        clause = ds.field(column).isin(list(values))
+        expr   = clause if expr is None else expr & clause
+    table = dataset.to_table(columns=list(columns) if columns else None, filter=expr)
+    return table.to_pandas(date_as_object=False)
+
+def write_ball_arrays(balls_df, out_dir: Path = BALL_ARRAYS_DIR):
+    """
+    Saves ARRAY_COLUMNS of balls_df as .npy files with a per-match offset
+    index. Team and player names are stored as integer codes; the shared
+    vocabularies go to vocab.json.
+    """
+    out_dir = Path(out_dir)
+    if out_dir.exists():
+        shutil.rmtree(out_dir)
+    out_dir.mkdir(parents=True)
+
+    match_ids = balls_df["match_id"].to_numpy().astype(str)
+    change    = np.flatnonzero(match_ids[1:] != match_ids[:-1]) + 1
+    starts    = np.concatenate([[0], change]).astype(np.int64)
+    if len(np.unique(match_ids[starts])) != len(starts):
+        raise ValueError("balls_df rows must be contiguous per match_id")
+    ends      = np.append(starts[1:], len(match_ids)).astype(np.int64)
+    np.save(out_dir / "match_ids.npy", match_ids[starts])
+    np.save(out_dir / "starts.npy", starts)
+    np.save(out_dir / "ends.npy", ends)
+
+    vocabs = {}
+    for column, dtype in ARRAY_COLUMNS.items():
+        series = balls_df[column]
+        if column in ARRAY_VOCABS:
+            categories = vocabs.setdefault(ARRAY_VOCABS[column],
+                                           list(series.cat.categories.astype(str)))
+            if list(series.cat.categories.astype(str)) != categories:
+                raise ValueError(f"{column} does not share the {ARRAY_VOCABS[column]} dictionary")
+            values = series.cat.codes.to_numpy()
+        else:
+            values = series.to_numpy()
+        np.save(out_dir / f"{column}.npy", np.ascontiguousarray(values, dtype=dtype))
+    (out_dir / "vocab.json").write_text(json.dumps(vocabs))
+
+class BallArrays:
+    """Read-only, memory-mapped view of a write_ball_arrays() directory."""
+
+    def __init__(self, path: Path = BALL_ARRAYS_DIR):
+        path = Path(path)
+        if not (path / "match_ids.npy").exists():
+            raise FileNotFoundError(f"No ball arrays at {path}. Run: python scripts/build_models.py")
+        self.columns = {c: np.load(path / f"{c}.npy", mmap_mode="r") for c in ARRAY_COLUMNS}
+        self.starts  = np.load(path / "starts.npy", mmap_mode="r")
+        self.ends    = np.load(path / "ends.npy", mmap_mode="r")
+        self.vocabs  = json.loads((path / "vocab.json").read_text())
+        self._offset = {m: i for i, m in enumerate(np.load(path / "match_ids.npy").tolist())}
+
+    def __len__(self):
+        return len(self.columns["over"])
+
+    def __contains__(self, match_id):
+        return str(match_id) in self._offset
+
+    @property
+    def match_ids(self):
+        return list(self._offset)
+
+    def span(self, match_id):
+        i = self._offset[str(match_id)]
+        return int(self.starts[i]), int(self.ends[i])
+
+    def match(self, match_id, columns=None):
+        """Zero-copy views of one match's deliveries, keyed by column."""
+        start, end = self.span(match_id)
+        return {c: self.columns[c][start:end] for c in (columns or self.columns)}
+
+    def decode(self, column, codes):
+        """Maps integer codes of a team/player column back to names."""
+        vocab = self.vocabs[ARRAY_VOCABS[column]]
+        return [vocab[c] for c in codes]
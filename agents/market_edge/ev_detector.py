@@ -1,11 +1,29 @@
+"""
+EV detection against bookmaker prices.
+
+scan_ev() prices a whole odds book at once: one row per (bookmaker, market,
+selection, over, line) price, with model probability, edge, EV per 1000
+and strength computed as columns, plus which rows carry the best price for
+their selection. detect_ev() takes one bookmaker's nested odds dict and
+returns EVSignal dataclasses as a view over the same scan.
+
+Markets:
+  match_winner  selection team_batting_first / team_batting_second (or the
+                team name); over and line are NaN
+  session_runs  selection over / under, innings-1 runs at the end of over
+"""
 from dataclasses import dataclass, field
 from typing import Optional
 import logging
+import numpy as np
+import pandas as pd
 
 logger = logging.getLogger(__name__)
 
 MIN_EDGE_PERCENT    = 4.0
 STRONG_EDGE_PERCENT = 8.0
+BOOK_COLUMNS        = ["bookmaker", "market", "selection", "over", "line", "odds"]
+SELECTION_KEYS      = ["market", "over", "line", "selection"]   # one price per bookmaker
 
 @dataclass
 class EVSignal:
@@ -35,53 +53,113 @@ def implied_to_decimal(prob):
         raise ValueError(f"Invalid prob: {prob}")
     return round(1.0 / prob, 3)
 
-def _compute_ev(market, selection, model_prob, decimal_odds, reasoning):
-    implied_prob = 1.0 / decimal_odds
-    edge_percent = (model_prob - implied_prob) * 100
-    if edge_percent < MIN_EDGE_PERCENT:
-        return None
-    ev = model_prob * (decimal_odds - 1) * 1000 - (1 - model_prob) * 1000
-    strength = "strong" if edge_percent >= STRONG_EDGE_PERCENT else "moderate"
-    return EVSignal(
-        market=market, selection=selection, model_prob=model_prob,
-        implied_prob=implied_prob, edge_percent=round(edge_percent, 2),
-        decimal_odds=decimal_odds, ev_per_1000=round(ev, 0),
-        strength=strength, reasoning=reasoning,
-    )
+def model_probabilities(sim_result, book):
+    """
+    Model probability for every book row, NaN where the result cannot price
+    it. Session rows are read from the stored score histograms, one
+    vectorized lookup per over; results without histograms fall back to
+    their priced prob_over_line.
+    """
+    market    = book["market"].to_numpy()
+    selection = book["selection"].to_numpy()
+    over      = book["over"].to_numpy(dtype=float)
+    line      = book["line"].to_numpy(dtype=float)
+    probs     = np.full(len(book), np.nan)
 
-def detect_ev(sim_result, match_label, bookmaker_odds):
+    winner = {"team_batting_first":  sim_result.win_prob_batting_first,
+              "team_batting_second": sim_result.win_prob_batting_second,
+              sim_result.team_batting_first:  sim_result.win_prob_batting_first,
+              sim_result.team_batting_second: sim_result.win_prob_batting_second}
+    rows = np.flatnonzero(market == "match_winner")
+    probs[rows] = [winner.get(sel, np.nan) for sel in selection[rows]]
+
+    session = market == "session_runs"
+    for s in sim_result.sessions:
+        rows = np.flatnonzero(session & (over == s.over))
+        if not len(rows):
+            continue
+        if s.distribution is not None:
+            cum = s.distribution.cumulative
+            r   = np.floor(line[rows]).astype(np.int64)
+            p   = (s.distribution.total - cum[np.clip(r, 0, len(cum) - 1)]) / s.distribution.total
+            p   = np.clip(np.where(r < 0, 1.0, np.where(r >= len(cum), 0.0, p)), 0.0, 1.0)
+        else:
+            p = np.array([s.prob_over_line.get(l, np.nan) for l in line[rows]])
+        probs[rows] = np.where(selection[rows] == "under", 1.0 - p, p)
+    return probs
+
+def scan_ev(sim_result, book, min_edge=MIN_EDGE_PERCENT, strong_edge=STRONG_EDGE_PERCENT):
+    """
+    book: DataFrame with BOOK_COLUMNS, any number of bookmakers and lines.
+    Returns a copy with model_prob, implied_prob, edge_percent, ev_per_1000,
+    strength ("strong" / "moderate" / ""), signal and best_price columns.
+    Rows with odds <= 1 or no model probability are never signals.
+    """
+    book  = book.reset_index(drop=True)
+    odds  = book["odds"].to_numpy(dtype=float)
+    model = model_probabilities(sim_result, book)
+    valid = (odds > 1) & ~np.isnan(model)
+    implied = np.divide(1.0, odds, out=np.full(len(odds), np.nan), where=odds > 1)
+    edge    = (model - implied) * 100
+    signal  = valid & (edge >= min_edge)
+    best    = book.groupby(SELECTION_KEYS, dropna=False, sort=False)["odds"].transform("max")
+
+    columns = pd.DataFrame({
+        "model_prob":   model,
+        "implied_prob": implied,
+        "edge_percent": edge,
+        "ev_per_1000":  model * (odds - 1) * 1000 - (1 - model) * 1000,
+        "strength":     np.where(signal & (edge >= strong_edge), "strong",
+                                 np.where(signal, "moderate", "")),
+        "signal":       signal,
+        "best_price":   odds == best.to_numpy(),
+    })
+    return pd.concat([book, columns], axis=1)
+
+def best_prices(book):
+    """Best odds and the bookmaker offering them, indexed by SELECTION_KEYS."""
+    rows = book.groupby(SELECTION_KEYS, dropna=False, sort=False)["odds"].idxmax()
+    return book.loc[rows, SELECTION_KEYS + ["bookmaker", "odds"]].set_index(SELECTION_KEYS)
+
+def odds_book(sim_result, bookmaker_odds, bookmaker="book"):
+    """
+    detect_ev's nested odds dict as book rows. A session price applies to
+    every line sim_result priced for that over.
+    """
+    rows = [(bookmaker, "match_winner", key, np.nan, np.nan, odds)
+            for key, odds in bookmaker_odds.get("match_winner", {}).items()]
+    for s in sim_result.sessions:
+        over_odds = bookmaker_odds.get("session_runs", {}).get(s.over, {})
+        for line in s.prob_over_line:
+            rows.extend((bookmaker, "session_runs", key, s.over, line, over_odds[key])
+                        for key in ("over", "under") if key in over_odds)
+    return pd.DataFrame(rows, columns=BOOK_COLUMNS)
+
+def ev_signals(sim_result, scan):
+    """EVSignal dataclasses for the signal rows of a scan_ev() frame, in book order."""
+    teams   = {"team_batting_first": sim_result.team_batting_first,
+               "team_batting_second": sim_result.team_batting_second}
     signals = []
-    mw = bookmaker_odds.get("match_winner", {})
-    if mw:
-        for team, prob, key in [
-            (sim_result.team_batting_first,  sim_result.win_prob_batting_first,  "team_batting_first"),
-            (sim_result.team_batting_second, sim_result.win_prob_batting_second, "team_batting_second"),
-        ]:
-            odds = mw.get(key, 0)
-            if odds > 1:
-                sig = _compute_ev(f"Match Winner — {team}", team, prob, odds,
-                                  f"Model gives {team} {prob:.1%} win prob.")
-                if sig:
-                    signals.append(sig)
-
-    for session in sim_result.sessions:
-        over_odds = bookmaker_odds.get("session_runs", {}).get(session.over, {})
-        for line, model_prob_over in session.prob_over_line.items():
-            for direction, prob, key in [
-                ("Over", model_prob_over,         "over"),
-                ("Under", 1 - model_prob_over,    "under"),
-            ]:
-                odds = over_odds.get(key, 0)
-                if odds > 1:
-                    sig = _compute_ev(
-                        "Session Runs",
-                        f"Runs {direction} {line} at {session.over} overs",
-                        prob, odds,
-                        f"Model: {prob:.1%} vs implied {1/odds:.1%}",
-                    )
-                    if sig:
-                        signals.append(sig)
+    for row in scan[scan["signal"]].itertuples(index=False):
+        prob = float(row.model_prob)
+        if row.market == "match_winner":
+            team = teams.get(row.selection, row.selection)
+            market, selection = f"Match Winner — {team}", team
+            reasoning = f"Model gives {team} {prob:.1%} win prob."
+        else:
+            market    = "Session Runs"
+            selection = f"Runs {row.selection.capitalize()} {row.line:g} at {int(row.over)} overs"
+            reasoning = f"Model: {prob:.1%} vs implied {row.implied_prob:.1%}"
+        signals.append(EVSignal(
+            market=market, selection=selection, model_prob=prob,
+            implied_prob=float(row.implied_prob), edge_percent=round(float(row.edge_percent), 2),
+            decimal_odds=row.odds, ev_per_1000=round(float(row.ev_per_1000), 0),
+            strength=row.strength, reasoning=reasoning,
+        ))
+    return signals
 
+def detect_ev(sim_result, match_label, bookmaker_odds):
+    signals  = ev_signals(sim_result, scan_ev(sim_result, odds_book(sim_result, bookmaker_odds)))
     strong   = sum(1 for s in signals if s.strength == "strong")
     moderate = sum(1 for s in signals if s.strength == "moderate")
     summary  = (f"{strong} strong, {moderate} moderate EV signals for {match_label}."
@@ -0,0 +1,122 @@
+"""
+Live odds book with incremental EV.
+
+OddsBook holds one scan_ev() worth of state as arrays, one entry per price.
+A tick (a single price moving) recomputes that row's edge and strength and
+the best price of its selection, so its cost depends on the number of
+bookmakers quoting the selection, not on the size of the book. reprice()
+swaps in new model probabilities after a simulation and recomputes every
+row in one vectorized pass. Both return EVEvents for the signals that
+appeared, disappeared or changed strength, and nothing for rows whose
+signal is unchanged.
+"""
+from dataclasses import dataclass
+import numpy as np
+import pandas as pd
+
+from agents.market_edge.ev_detector import (
+    BOOK_COLUMNS, MIN_EDGE_PERCENT, SELECTION_KEYS, STRONG_EDGE_PERCENT,
+)
+
+STRENGTHS = ("", "moderate", "strong")
+
+@dataclass
+class EVEvent:
+    kind: str          # "appeared", "disappeared" or "changed"
+    key: tuple         # (bookmaker, market, selection, over, line)
+    strength: str      # "" once a signal has disappeared
+    previous: str
+    edge_percent: float
+    odds: float
+
+def _key(value):
+    """NaN over/line become None so keys hash and compare equal."""
+    return None if isinstance(value, float) and np.isnan(value) else value
+
+class OddsBook:
+    def __init__(self, book, model_prob=None, min_edge=MIN_EDGE_PERCENT,
+                 strong_edge=STRONG_EDGE_PERCENT):
+        """book: BOOK_COLUMNS rows, one per price; model_prob aligned with them (NaN = unpriced)."""
+        self.book        = book[BOOK_COLUMNS].reset_index(drop=True)
+        self.min_edge    = min_edge
+        self.strong_edge = strong_edge
+        self.odds  = self.book["odds"].to_numpy(dtype=float).copy()
+        self.model = np.full(len(self.book), np.nan)
+        self.level = np.zeros(len(self.book), np.int8)     # index into STRENGTHS
+        self.edge  = np.full(len(self.book), np.nan)
+
+        keys = [tuple(_key(v) for v in row) for row in
+                self.book[["bookmaker", "market", "selection", "over", "line"]].itertuples(index=False)]
+        self.keys   = keys
+        self.rows   = {key: i for i, key in enumerate(keys)}
+        groups      = self.book.groupby(SELECTION_KEYS, dropna=False, sort=False).indices
+        self.groups = [np.asarray(rows) for rows in groups.values()]
+        self.group  = np.empty(len(self.book), np.int64)
+        for g, rows in enumerate(self.groups):
+            self.group[rows] = g
+        self.best = np.zeros(len(self.book), bool)
+        for rows in self.groups:
+            self._update_best(rows)
+        if model_prob is not None:
+            self.reprice(model_prob)
+
+    def __len__(self):
+        return len(self.book)
+
+    def _levels(self, model, odds):
+        implied = np.divide(1.0, odds, out=np.full(len(odds), np.nan), where=odds > 1)
+        edge    = (model - implied) * 100
+        signal  = (odds > 1) & ~np.isnan(model) & (edge >= self.min_edge)
+        return edge, (signal.astype(np.int8) + (signal & (edge >= self.strong_edge)))
+
+    def _update_best(self, rows):
+        prices = self.odds[rows]
+        self.best[rows] = prices == prices.max()
+
+    def _events(self, rows, before):
+        """EVEvents for rows whose strength is no longer before (aligned with rows)."""
+        events = []
+        for i, was in zip(rows, before):
+            old, new = STRENGTHS[was], STRENGTHS[self.level[i]]
+            if old == new:
+                continue
+            kind = "appeared" if not old else "disappeared" if not new else "changed"
+            events.append(EVEvent(kind, self.keys[i], new, old, float(self.edge[i]), float(self.odds[i])))
+        return events
+
+    def tick(self, market, selection, odds, over=None, line=None, bookmaker="book"):
+        """One price moved. Returns the EVEvents it caused (usually none)."""
+        i      = self.rows[(bookmaker, market, selection, over, line)]
+        before = self.level[i]
+        self.odds[i] = odds
+        edge, level  = self._levels(self.model[i:i + 1], self.odds[i:i + 1])
+        self.edge[i], self.level[i] = edge[0], level[0]
+        self._update_best(self.groups[self.group[i]])
+        return self._events([i], [before])
+
+    def apply(self, ticks):
+        """ticks: iterable of tick() argument tuples. Returns all their events."""
+        return [event for t in ticks for event in self.tick(*t)]
+
+    def reprice(self, model_prob):
+        """New model probabilities for every row, e.g. after a simulation."""
+        before = self.level.copy()
+        self.model = np.asarray(model_prob, dtype=float).copy()
+        self.edge, self.level = self._levels(self.model, self.odds)
+        rows = np.flatnonzero(self.level != before)
+        return self._events(rows, before[rows])
+
+    def scan(self):
+        """The current state in scan_ev()'s layout."""
+        model, odds = self.model, self.odds
+        implied = np.divide(1.0, odds, out=np.full(len(odds), np.nan), where=odds > 1)
+        columns = pd.DataFrame({
+            "model_prob":   model,
+            "implied_prob": implied,
+            "edge_percent": self.edge,
+            "ev_per_1000":  model * (odds - 1) * 1000 - (1 - model) * 1000,
+            "strength":     np.array(STRENGTHS, dtype=object)[self.level],
+            "signal":       self.level > 0,
+            "best_price":   self.best.copy(),
+        })
+        return pd.concat([self.book.assign(odds=odds), columns], axis=1)
@@ -0,0 +1,173 @@
+"""
+Precomputed player and venue aggregates over the ball-by-ball data.
+
+PlayerIndex holds additive totals per batter, bowler, venue and
+(batter, venue), plus each batter's last five innings scores, in plain
+dicts: every lookup is O(1) and derived rates are computed on read.
+update() folds in only matches it has not seen, so the nightly build does
+not rescan history.
+
+Dismissals are charged to the batter on strike; the feed does not record
+which batter was out, so non-striker run-outs land on the striker.
+"""
+import json
+from pathlib import Path
+
+from config.settings import PLAYER_INDEX_PATH
+
+FORM_WEIGHTS       = [2.0, 1.5, 1.2, 1.0, 0.8]
+NON_BOWLER_WICKETS = {"run out", "retired hurt", "retired out", "obstructing the field"}
+INDEX_VERSION      = 1
+
+def form_index(scores):
+    """Recency-weighted mean of up to five scores, most recent first."""
+    if not scores: return 20.0   # default for bowlers
+    weights = FORM_WEIGHTS
+    total_w = sum(weights[:len(scores)])
+    return round(sum(s*w for s,w in zip(scores, weights[:len(scores)])) / total_w, 1)
+
+class PlayerIndex:
+    def __init__(self):
+        self.batters       = {}
+        self.bowlers       = {}
+        self.venues        = {}
+        self.batter_venues = {}
+        self.match_ids     = set()
+
+    # ── lookups ──────────────────────────────────────────────
+    def batter(self, name):
+        return _batting_view(self.batters.get(name))
+
+    def bowler(self, name):
+        return _bowling_view(self.bowlers.get(name))
+
+    def venue(self, name):
+        return _bowling_view(self.venues.get(name))
+
+    def batter_at_venue(self, name, venue):
+        return _batting_view(self.batter_venues.get(name, {}).get(venue))
+
+    # ── build / update ───────────────────────────────────────
+    @classmethod
+    def build(cls, balls_df):
+        index = cls()
+        index.update(balls_df)
+        return index
+
+    def update(self, balls_df):
+        """Adds every match in balls_df not already indexed. Returns the number added."""
+        new = balls_df[~balls_df["match_id"].isin(self.match_ids)]
+        if not len(new):
+            return 0
+        new = new[["match_id", "date", "venue", "innings", "batter", "bowler",
+                   "runs_batter", "runs_total", "is_wicket", "wicket_kind"]].copy()
+        for column in ("date", "venue", "batter", "bowler", "wicket_kind"):
+            new[column] = new[column].astype(str)
+        new["bowler_wicket"] = new["is_wicket"].astype(bool) & ~new["wicket_kind"].isin(NON_BOWLER_WICKETS)
+
+        # One row per batter innings; batting totals and form are built from these
+        innings = (
+            new.groupby(["batter", "venue", "match_id", "innings"], sort=False)
+            .agg(date=("date", "first"), runs=("runs_batter", "sum"),
+                 balls=("runs_batter", "size"), dismissals=("is_wicket", "sum"))
+            .reset_index()
+        )
+        _add_totals(self.batters, innings.groupby("batter")[["runs", "balls", "dismissals"]].sum())
+        _add_totals(self.batter_venues,
+                    innings.groupby(["batter", "venue"])[["runs", "balls", "dismissals"]].sum())
+        _add_recent(self.batters, innings, ["batter"])
+        _add_recent(self.batter_venues, innings, ["batter", "venue"])
+
+        bowling = new.rename(columns={"runs_total": "runs"}).assign(balls=1)
+        _add_totals(self.bowlers, bowling.groupby("bowler").agg(
+            runs=("runs", "sum"), balls=("balls", "sum"), dismissals=("bowler_wicket", "sum")))
+        _add_totals(self.venues, bowling.groupby("venue").agg(
+            runs=("runs", "sum"), balls=("balls", "sum"), dismissals=("is_wicket", "sum")))
+
+        self.match_ids.update(new["match_id"].unique())
+        return new["match_id"].nunique()
+
+    # ── persistence ──────────────────────────────────────────
+    def save(self, path: Path = PLAYER_INDEX_PATH):
+        path = Path(path)
+        path.parent.mkdir(parents=True, exist_ok=True)
+        payload = {
+            "version":       INDEX_VERSION,
+            "batters":       self.batters,
+            "bowlers":       self.bowlers,
+            "venues":        self.venues,
+            "batter_venues": self.batter_venues,
+            "match_ids":     sorted(self.match_ids),
+        }
+        tmp = path.with_suffix(".tmp")
+        tmp.write_text(json.dumps(payload, separators=(",", ":")))
+        tmp.replace(path)
+
+    @classmethod
+    def load(cls, path: Path = PLAYER_INDEX_PATH):
+        """Loads a saved index; a missing or outdated file gives an empty one."""
+        index = cls()
+        path  = Path(path)
+        if not path.exists():
+            return index
+        payload = json.loads(path.read_text())
+        if payload.get("version") != INDEX_VERSION:
+            return index
+        index.batters       = payload["batters"]
+        index.bowlers       = payload["bowlers"]
+        index.venues        = payload["venues"]
+        index.batter_venues = payload["batter_venues"]
+        index.match_ids     = set(payload["match_ids"])
+        return index
+
+def _slot(table, key):
+    if isinstance(key, tuple):
+        table = table.setdefault(key[0], {})
+        key   = key[1]
+    return table.setdefault(key, {"runs": 0, "balls": 0, "dismissals": 0})
+
+def _add_totals(table, totals):
+    for key, row in zip(totals.index, totals.itertuples(index=False)):
+        entry = _slot(table, key)
+        entry["runs"]       += int(row.runs)
+        entry["balls"]      += int(row.balls)
+        entry["dismissals"] += int(row.dismissals)
+
+def _add_recent(table, innings, keys):
+    """Merges each key's newest innings into its stored [date, score] list, newest first."""
+    latest = (innings.sort_values(["date", "match_id", "innings"], ascending=False)
+              .groupby(keys, sort=False).head(len(FORM_WEIGHTS)))
+    fresh  = {}
+    for row in latest[keys + ["date", "runs"]].itertuples(index=False, name=None):
+        key = row[:len(keys)] if len(keys) > 1 else row[0]
+        fresh.setdefault(key, []).append([row[-2], int(row[-1])])
+    for key, items in fresh.items():
+        entry  = _slot(table, key)
+        recent = entry.get("recent", []) + items
+        recent.sort(key=lambda item: item[0], reverse=True)
+        entry["recent"] = recent[:len(FORM_WEIGHTS)]
+
+def _batting_view(entry):
+    if entry is None:
+        return None
+    scores = [runs for _, runs in entry.get("recent", [])]
+    return {
+        "runs":        entry["runs"],
+        "balls":       entry["balls"],
+        "dismissals":  entry["dismissals"],
+        "average":     round(entry["runs"] / entry["dismissals"], 1) if entry["dismissals"] else None,
+        "strike_rate": round(entry["runs"] / entry["balls"] * 100, 1) if entry["balls"] else 0.0,
+        "form":        form_index(scores),
+        "recent":      scores,
+    }
+
+def _bowling_view(entry):
+    if entry is None:
+        return None
+    return {
+        "runs":        entry["runs"],
+        "balls":       entry["balls"],
+        "dismissals":  entry["dismissals"],
+        "strike_rate": round(entry["balls"] / entry["dismissals"], 1) if entry["dismissals"] else None,
+        "economy":     round(entry["runs"] / entry["balls"] * 6, 2) if entry["balls"] else 0.0,
+    }
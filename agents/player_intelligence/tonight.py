@@ -2,14 +2,14 @@
 Player-adjusted simulation for ZIM vs WI tonight.
 Edit BAT_FIRST, TOSS_WINNER, TOSS_DEC after 6:30PM toss.
 """
-import sys, pandas as pd
+import sys
 from pathlib import Path
 sys.path.insert(0, str(Path(__file__).parent.parent.parent))
 
 from agents.context_engine.context import build_match_context
-from agents.simulation.monte_carlo import simulate_match
+from agents.simulation.cache import cached_simulate_match
 from agents.market_edge.ev_detector import detect_ev
-from config.settings import DATA_PROCESSED
+from agents.player_intelligence.aggregates import PlayerIndex, form_index
 
 # ── EDIT AFTER TOSS ───────────────────────────────────────────
 BAT_FIRST   = "Zimbabwe"
@@ -83,13 +83,6 @@ WI_XI  = ["B King","SD Hope","SO Hetmyer","R Chase",
           "M Forde","A Hosein","G Motie","S Joseph"]
 
 
-def form_index(scores):
-    if not scores: return 20.0   # default for bowlers
-    weights = [2.0, 1.5, 1.2, 1.0, 0.8]
-    total_w = sum(weights[:len(scores)])
-    return round(sum(s*w for s,w in zip(scores, weights[:len(scores)])) / total_w, 1)
-
-
 def analyze_xi(xi, team_code):
     profiles  = [ALL_PLAYERS[p] for p in xi if p in ALL_PLAYERS]
     missing   = [p for p in xi if p not in ALL_PLAYERS]
@@ -112,16 +105,17 @@ def analyze_xi(xi, team_code):
 
 def main():
     # Also pull Wankhede IPL stats from our real data
-    balls = pd.read_csv(DATA_PROCESSED / "balls.csv", low_memory=False)
-    wank  = balls[balls["venue"].str.contains("Wankhede", na=False)]
+    index  = PlayerIndex.load()
+    venues = [v for v in index.venues if "Wankhede" in v]
+    venue_balls = sum(index.venue(v)["balls"] for v in venues)
 
     cricsheet_players = list(PLAYERS.keys())
     wank_stats = []
     for p in cricsheet_players:
-        pb = wank[wank["batter"] == p]
-        if len(pb) > 10:
-            runs  = pb["runs_batter"].sum()
-            balls_faced = len(pb)
+        records     = [r for r in (index.batter_at_venue(p, v) for v in venues) if r]
+        runs        = sum(r["runs"] for r in records)
+        balls_faced = sum(r["balls"] for r in records)
+        if balls_faced > 10:
             wank_stats.append((p, runs, balls_faced, round(runs/balls_faced*100,1)))
 
     print("=" * 65)
@@ -129,7 +123,7 @@ def main():
     print("=" * 65)
 
     if wank_stats:
-        print("\n  WANKHEDE IPL RECORDS (from our 30,138 ball dataset):")
+        print(f"\n  WANKHEDE IPL RECORDS (from our {venue_balls:,} ball dataset):")
         print(f"  {'Player':20s} {'Runs':>6} {'Balls':>6} {'SR':>7}")
         print(f"  {'-'*20} {'-'*6} {'-'*6} {'-'*7}")
         for name, runs, b, sr in sorted(wank_stats, key=lambda x: x[1], reverse=True):
@@ -173,7 +167,7 @@ def main():
     ctx.venue_avg_runs  = 160
     ctx.run_adjustment  = ctx.dew_risk * 8 + 160 * (ctx.stage_run_multiplier - 1) + bat_first_adj
 
-    sim = simulate_match(ctx,
+    sim = cached_simulate_match(ctx,
         lines={
             6:  [46.5, 51.0],
             10: [76.0, 82.0],
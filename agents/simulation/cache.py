@@ -0,0 +1,158 @@
+"""
+Memoized simulate_match.
+
+Results are keyed on a canonical hash of every MatchContext field, the
+lines, iterations and seed, plus ENGINE_VERSION and a fingerprint of the
+constants in config.settings, so a settings edit or engine change misses
+instead of serving stale numbers.
+
+Two tiers:
+  memory  LRU of the most recent results, per process
+  disk    one pickle per key under SIM_CACHE_DIR, shared across processes;
+          entries older than the TTL are ignored and pruned, and the
+          oldest are evicted beyond the entry bound
+"""
+import copy, hashlib, json, pickle, time
+from collections import OrderedDict
+from dataclasses import asdict
+from pathlib import Path
+
+import config.settings as settings
+from agents.simulation.monte_carlo import ENGINE_VERSION, simulate_match
+from config.settings import (
+    MONTE_CARLO_ITERATIONS, RANDOM_SEED, SIM_CACHE_DIR, SIM_CACHE_DISK_ENTRIES,
+    SIM_CACHE_MEMORY_ENTRIES, SIM_CACHE_TTL_SECONDS,
+)
+
+def settings_fingerprint():
+    """Hash of every upper-case constant in config.settings."""
+    constants = {name: getattr(settings, name) for name in dir(settings) if name.isupper()}
+    return hashlib.sha1(json.dumps(constants, sort_keys=True, default=str).encode()).hexdigest()
+
+def simulation_key(context, lines=None, iterations=MONTE_CARLO_ITERATIONS, seed=RANDOM_SEED,
+                   target_se=None, sampling="mc"):
+    payload = {
+        "engine":     ENGINE_VERSION,
+        "settings":   settings_fingerprint(),
+        "context":    asdict(context),
+        # Line order is kept: it is the order of prob_over_line in the result
+        "lines":      sorted((int(over), list(values)) for over, values in (lines or {}).items()),
+        "iterations": iterations,
+        "seed":       seed,
+        "target_se":  target_se,
+        "sampling":   sampling,
+    }
+    return hashlib.sha1(json.dumps(payload, sort_keys=True, default=str).encode()).hexdigest()
+
+class SimulationCache:
+    def __init__(self, cache_dir: Path = SIM_CACHE_DIR, memory_entries=SIM_CACHE_MEMORY_ENTRIES,
+                 disk_entries=SIM_CACHE_DISK_ENTRIES, ttl=SIM_CACHE_TTL_SECONDS):
+        self.cache_dir      = Path(cache_dir) if cache_dir else None
+        self.memory_entries = memory_entries
+        self.disk_entries   = disk_entries
+        self.ttl            = ttl
+        self._memory        = OrderedDict()
+        self.memory_hits    = 0
+        self.disk_hits      = 0
+        self.misses         = 0
+
+    def stats(self):
+        lookups = self.memory_hits + self.disk_hits + self.misses
+        return {
+            "memory_hits": self.memory_hits,
+            "disk_hits":   self.disk_hits,
+            "misses":      self.misses,
+            "hit_rate":    round((lookups - self.misses) / lookups, 3) if lookups else 0.0,
+        }
+
+    def get(self, key):
+        if key in self._memory:
+            self._memory.move_to_end(key)
+            self.memory_hits += 1
+            return copy.deepcopy(self._memory[key])
+        result = self._read_disk(key)
+        if result is None:
+            self.misses += 1
+            return None
+        self.disk_hits += 1
+        self._remember(key, result)
+        return copy.deepcopy(result)
+
+    def put(self, key, result):
+        result = copy.deepcopy(result)
+        self._remember(key, result)
+        if self.cache_dir:
+            self.cache_dir.mkdir(parents=True, exist_ok=True)
+            path = self._path(key)
+            tmp  = path.with_suffix(".tmp")
+            tmp.write_bytes(pickle.dumps(result))
+            tmp.replace(path)
+            self._evict_disk()
+
+    def clear(self):
+        self._memory.clear()
+        if self.cache_dir and self.cache_dir.exists():
+            for path in self.cache_dir.glob("*.pkl"):
+                path.unlink(missing_ok=True)
+
+    def simulate(self, context, lines=None, iterations=MONTE_CARLO_ITERATIONS, seed=RANDOM_SEED,
+                 target_se=None, sampling="mc"):
+        key    = simulation_key(context, lines, iterations, seed, target_se, sampling)
+        result = self.get(key)
+        if result is None:
+            result = simulate_match(context, lines=lines, iterations=iterations, seed=seed,
+                                    target_se=target_se, sampling=sampling)
+            self.put(key, result)
+        return result
+
+    def _remember(self, key, result):
+        self._memory[key] = result
+        self._memory.move_to_end(key)
+        while len(self._memory) > self.memory_entries:
+            self._memory.popitem(last=False)
+
+    def _path(self, key):
+        return self.cache_dir / f"{key}.pkl"
+
+    def _read_disk(self, key):
+        if not self.cache_dir:
+            return None
+        path = self._path(key)
+        try:
+            if time.time() - path.stat().st_mtime > self.ttl:
+                path.unlink(missing_ok=True)
+                return None
+            return pickle.loads(path.read_bytes())
+        except (OSError, pickle.UnpicklingError, EOFError):
+            return None
+
+    def _evict_disk(self):
+        """Drops expired entries, then the oldest ones beyond disk_entries."""
+        now     = time.time()
+        entries = []
+        for path in self.cache_dir.glob("*.pkl"):
+            try:
+                mtime = path.stat().st_mtime
+            except OSError:
+                continue
+            if now - mtime > self.ttl:
+                path.unlink(missing_ok=True)
+            else:
+                entries.append((mtime, path))
+        entries.sort()
+        for _, path in entries[:max(0, len(entries) - self.disk_entries)]:
+            path.unlink(missing_ok=True)
+
+_default_cache = None
+
+def default_cache():
+    global _default_cache
+    if _default_cache is None:
+        _default_cache = SimulationCache()
+    return _default_cache
+
+def cached_simulate_match(context, lines=None, iterations=MONTE_CARLO_ITERATIONS, seed=RANDOM_SEED,
+                          target_se=None, sampling="mc"):
+    """simulate_match through the shared process-wide cache."""
+    return default_cache().simulate(context, lines=lines, iterations=iterations, seed=seed,
+                                    target_se=target_se, sampling=sampling)
@@ -0,0 +1,120 @@
+"""
+Second-innings win probability by backward induction.
+
+For a chase the state is (runs needed, balls left, wickets in hand), and
+the ball model in monte_carlo.py gives every ball's outcome distribution:
+a wicket with probability p, otherwise 0-6 runs from the clipped Poisson at
+the rate for the wickets already down. Working back from the last ball,
+
+  V(b, d, r) = p_b V(b+1, d+1, r) + (1 - p_b) sum_k P_b(k | d) V(b+1, d, r-k)
+
+with V = 1 once r <= 0, and TIE_VALUE for finishing level (one run short
+when the balls or wickets run out). Like simulate_match, simulate_live and
+exact_match, a tie goes to the chase by default, so innings-2 prices line
+up with innings 1 at the break. One profile, meaning a chase's per-ball
+rates, fills the whole (121 x 11 x MAX_NEEDED+1) table in a few
+milliseconds. Live queries are then single array reads.
+"""
+from collections import OrderedDict
+from pathlib import Path
+import numpy as np
+
+from agents.simulation.distribution import MAX_RUNS, ScoreDistribution
+from agents.simulation.monte_carlo import (
+    ALL_OUT, SimulationResult, _clipped_poisson_cdf, _match_rates, _wicket_run_means,
+)
+
+MAX_NEEDED    = 300
+TIE_VALUE     = 1.0     # finishing level counts as a chase win, as in simulate_match
+TABLE_ENTRIES = 32      # profiles kept by chase_table_for()
+
+_tables = OrderedDict()
+
+class ChaseTable:
+    """win[balls_left, wickets_in_hand, runs_needed] = P(chasing side wins)."""
+
+    def __init__(self, win):
+        self.win = np.asarray(win)
+
+    def __repr__(self):
+        return f"ChaseTable({self.win.shape[2] - 1} runs x {self.win.shape[0] - 1} balls)"
+
+    def win_prob(self, runs_needed, balls_left, wickets_in_hand):
+        if runs_needed <= 0:
+            return 1.0
+        if runs_needed >= self.win.shape[2]:
+            return 0.0
+        balls_left      = min(max(int(balls_left), 0), self.win.shape[0] - 1)
+        wickets_in_hand = min(max(int(wickets_in_hand), 0), ALL_OUT)
+        return float(self.win[balls_left, wickets_in_hand, int(runs_needed)])
+
+    def save(self, path: Path):
+        np.savez_compressed(path, win=self.win)
+
+    @classmethod
+    def load(cls, path: Path):
+        with np.load(path) as data:
+            return cls(data["win"])
+
+def chase_table(run_means, wicket_probs, max_needed=MAX_NEEDED):
+    """run_means, wicket_probs: (120,) innings-2 rates, as from monte_carlo._ball_rates."""
+    run_means, wicket_probs = np.asarray(run_means, float), np.asarray(wicket_probs, float)
+    rates = _wicket_run_means(run_means[None], wicket_probs[None])[0]
+    pmf   = np.diff(_clipped_poisson_cdf(rates), prepend=0.0, append=1.0, axis=-1)[:, :ALL_OUT]
+    n     = len(run_means)
+
+    # value[d, r]: d wickets down, r runs needed; r = 0 is a completed chase
+    value = np.zeros((ALL_OUT + 1, max_needed + 1))
+    value[:, 0] = 1.0
+    value[:, 1] = TIE_VALUE
+    win = np.empty((n + 1, ALL_OUT + 1, max_needed + 1), dtype=np.float32)
+    win[0] = value[::-1]
+    padded = np.empty((ALL_OUT, max_needed + 7))
+    padded[:, :6] = 1.0                               # overshooting the target still wins
+    for balls_left in range(1, n + 1):
+        b = n - balls_left
+        padded[:, 6:] = value[:ALL_OUT]
+        scored = sum(pmf[b, :, k, None] * padded[:, 6 - k:6 - k + max_needed + 1] for k in range(7))
+        step   = np.empty_like(value)
+        step[:ALL_OUT] = wicket_probs[b] * value[1:] + (1.0 - wicket_probs[b]) * scored
+        step[ALL_OUT]  = value[ALL_OUT]               # all out: the result stands
+        step[:, 0]     = 1.0
+        value = step
+        win[balls_left] = value[::-1]                 # index by wickets in hand
+    return ChaseTable(win)
+
+def chase_table_for(context):
+    """The chase table for context's innings-2 profile, built once per profile."""
+    run_means, wicket_probs = _match_rates(context)[1]
+    key = (run_means.tobytes(), wicket_probs.tobytes())
+    if key in _tables:
+        _tables.move_to_end(key)
+    else:
+        _tables[key] = chase_table(run_means, wicket_probs)
+        if len(_tables) > TABLE_ENTRIES:
+            _tables.popitem(last=False)
+    return _tables[key]
+
+def chase_match(context, runs, wickets, balls_left, target):
+    """
+    A SimulationResult for a chase in progress straight from the chase table
+    (iterations=0). Innings 1 is settled at target - 1; the innings-1
+    sessions are over, and innings 2 has no distribution, so its mean and
+    std are NaN.
+    """
+    chase  = chase_table_for(context).win_prob(target - runs, balls_left, ALL_OUT - wickets)
+    first  = np.zeros(MAX_RUNS + 1)
+    first[min(target - 1, MAX_RUNS)] = 1.0
+    return SimulationResult(
+        team_batting_first=context.team_batting_first,
+        team_batting_second=context.team_batting_second,
+        win_prob_batting_first=round(1.0 - chase, 4),
+        win_prob_batting_second=round(chase, 4),
+        innings1_mean=float(target - 1),
+        innings1_std=0.0,
+        innings2_mean=float("nan"),
+        innings2_std=float("nan"),
+        sessions=[],
+        iterations=0,
+        innings1_distribution=ScoreDistribution(first),
+    )
@@ -0,0 +1,81 @@
+"""
+Score distributions kept as fixed-size histograms.
+
+A ScoreDistribution holds a weight per run value 0..MAX_RUNS: iteration
+counts from a simulation, or probabilities from the exact engine. Its size
+does not depend on how many iterations produced it, so million-path runs
+are summarised in a few kilobytes, and chunks merge by adding weights.
+"""
+import numpy as np
+
+MAX_RUNS = 6 * 120
+
+class ScoreDistribution:
+    def __init__(self, weights):
+        self.weights = np.asarray(weights)
+        self.total   = float(self.weights.sum())
+        self._cum    = None
+
+    @classmethod
+    def from_scores(cls, scores, size=MAX_RUNS + 1):
+        return cls(np.bincount(np.asarray(scores), minlength=size))
+
+    def __add__(self, other):
+        return ScoreDistribution(self.weights + other.weights)
+
+    def __eq__(self, other):
+        return isinstance(other, ScoreDistribution) and np.array_equal(self.weights, other.weights)
+
+    def __repr__(self):
+        return f"ScoreDistribution(mean={self.mean:.1f}, std={self.std:.1f}, total={self.total:g})"
+
+    def __getstate__(self):
+        return {"weights": self.weights}
+
+    def __setstate__(self, state):
+        self.__init__(state["weights"])
+
+    @property
+    def pmf(self):
+        return self.weights / self.total
+
+    @property
+    def cumulative(self):
+        """Weight at or below each score, computed once."""
+        if self._cum is None:
+            self._cum = np.cumsum(self.weights)
+        return self._cum
+
+    @property
+    def cdf(self):
+        """P(score <= r) for r = 0..MAX_RUNS."""
+        return self.cumulative / self.total
+
+    @property
+    def mean(self):
+        return float(self.weights @ np.arange(len(self.weights)) / self.total)
+
+    @property
+    def std(self):
+        """Population standard deviation, as np.std of the underlying scores."""
+        values = np.arange(len(self.weights))
+        var    = self.weights @ (values - self.mean) ** 2 / self.total
+        return float(np.sqrt(max(var, 0.0)))
+
+    def prob_over(self, line):
+        """P(score > line); line may be fractional, e.g. 160.5."""
+        r = int(np.floor(line))
+        if r < 0:
+            return 1.0
+        if r >= len(self.weights):
+            return 0.0
+        return float(min(max((self.total - self.cumulative[r]) / self.total, 0.0), 1.0))
+
+    def prob_between(self, low, high):
+        """P(low < score <= high)."""
+        return max(self.prob_over(low) - self.prob_over(high), 0.0)
+
+    def quantile(self, q):
+        """Smallest score whose cumulative probability reaches q."""
+        return int(min(np.searchsorted(self.cumulative, q * self.total - 1e-9 * self.total),
+                       len(self.weights) - 1))
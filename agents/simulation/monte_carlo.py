@@ -1,14 +1,67 @@
+"""
+Monte Carlo match simulation.
+
+Every ball is driven by one U[0,1) draw, so the engine is indifferent to
+where the draws come from. sampling selects the source:
+
+  mc          independent pseudo-random draws
+  antithetic  the second half of the iterations mirror the first (1 - u)
+  sobol       scrambled Sobol points, one dimension per ball of each innings
+  exact       no draws: exact.exact_match(), iterations and seed ignored
+
+simulate_scenarios() runs variants of one match (toss call, absent player)
+on common random numbers, so their differences are not swamped by noise.
+simulate_live() resumes a match in progress from a LiveState.
+
+shards=N splits each match's iterations into N shards with independent
+streams spawned from one SeedSequence(seed); workers=W runs the shards on a
+process pool. Shard histograms are added in shard order, so the result
+depends only on (seed, shards), never on workers.
+python scripts/benchmark_simulation.py parallel prints speedup against
+workers for the machine it runs on.
+"""
+import warnings
+from functools import lru_cache
+from concurrent.futures import ProcessPoolExecutor
 import numpy as np
-from dataclasses import dataclass, field
+import pandas as pd
+from dataclasses import dataclass, field, replace
 from typing import Optional
+
+try:
+    from scipy.stats import qmc
+except ImportError:
+    qmc = None
+
+from agents.context_engine.context import MatchContext
+from agents.simulation.distribution import MAX_RUNS, ScoreDistribution
 from config.settings import MONTE_CARLO_ITERATIONS, RANDOM_SEED, SESSION_OVERS
 
+ENGINE_VERSION   = 4           # bump when simulation output changes for the same inputs
+MAX_BATCH_CELLS  = 1_500_000   # uniform draws per innings held at once (~90MB of working buffers)
+ADAPTIVE_BATCH   = 1_000       # iterations per batch when simulating to a target_se
+SAMPLING_MODES   = ("mc", "antithetic", "sobol")
+CHECKPOINTS      = sorted(set(SESSION_OVERS) | {20})   # overs histogrammed for innings 1
+ALL_OUT          = 10
+WICKET_RUN_DECAY = 0.04        # scoring rate lost per wicket down
+
+@dataclass
+class LiveState:
+    innings: int                   # 1 or 2
+    runs: int
+    wickets: int
+    balls: int                     # legal balls bowled in this innings
+    target: Optional[int] = None   # innings 2: innings-1 total + 1
+
 @dataclass
 class SessionResult:
     over: int
     mean_runs: float
     std_runs: float
     prob_over_line: dict = field(default_factory=dict)
+    mean_wickets: float = 0.0
+    wickets_pmf: list = field(default_factory=list)   # P(wickets down == k), k = 0..10
+    distribution: Optional[ScoreDistribution] = None  # runs at the end of this over
 
 @dataclass
 class SimulationResult:
@@ -21,9 +74,43 @@ class SimulationResult:
     innings2_mean: float
     innings2_std: float
     sessions: list = field(default_factory=list)
-    iterations: int = MONTE_CARLO_ITERATIONS
+    iterations: int = MONTE_CARLO_ITERATIONS   # iterations actually simulated
+    innings1_distribution: Optional[ScoreDistribution] = None
+    innings2_distribution: Optional[ScoreDistribution] = None
+
+    # Any line from one simulation: the histograms answer each query with a
+    # lookup in their cumulative weights (a binary search for quantiles).
+    def distribution(self, over=20, innings=1):
+        """Innings-1 runs at the end of a checkpoint over, or the innings-2 total."""
+        if innings == 2:
+            dist = self.innings2_distribution
+        elif over == 20 and self.innings1_distribution is not None:
+            dist = self.innings1_distribution
+        else:
+            dist = next((s.distribution for s in self.sessions if s.over == over), None)
+        if dist is None:
+            raise ValueError(f"no score distribution for innings {innings}, over {over}")
+        return dist
+
+    def prob_over(self, over, line, innings=1):
+        return self.distribution(over, innings).prob_over(line)
+
+    def prob_between(self, over, low, high, innings=1):
+        """P(low < score <= high), e.g. (150.5, 160.5) for 151-160."""
+        return self.distribution(over, innings).prob_between(low, high)
+
+    def quantile(self, over, q, innings=1):
+        return self.distribution(over, innings).quantile(q)
+
+    def with_lines(self, lines):
+        """A copy whose sessions price lines ({over: [lines]}) from the stored histograms."""
+        return replace(self, sessions=[
+            replace(s, prob_over_line={line: self.prob_over(s.over, line)
+                                       for line in lines.get(s.over, [])})
+            for s in self.sessions])
 
-def _simulate_innings(rng, iterations, mean_total, std_total, powerplay_mean, wicket_rate_boost):
+def _ball_rates(mean_total, powerplay_mean, wicket_rate_boost):
+    """Per-ball run means and wicket probabilities for the three phases, shape (120,) each."""
     phases = [
         (6,  powerplay_mean / 36,          0.028 + wicket_rate_boost),
         (9,  (mean_total * 0.32) / 54,     0.038 + wicket_rate_boost),
@@ -34,51 +121,437 @@ def _simulate_innings(rng, iterations, mean_total, std_total, powerplay_mean, wi
         balls = overs_in_phase * 6
         run_means.extend([run_mean_pb] * balls)
         wicket_probs.extend([wkt_prob_pb] * balls)
+    return np.array(run_means), np.array(wicket_probs)
 
-    run_means_arr    = np.array(run_means)
-    wicket_probs_arr = np.array(wicket_probs)
-    ball_runs        = np.clip(rng.poisson(lam=run_means_arr, size=(iterations, 120)), 0, 6)
-    cumulative_runs  = np.cumsum(ball_runs, axis=1)
-    cumulative_at_over = {over: cumulative_runs[:, over * 6 - 1] for over in SESSION_OVERS}
-    return cumulative_runs[:, -1], cumulative_at_over
+def _clipped_poisson_cdf(run_means):
+    """CDF of min(Poisson(lam), 6) at 0..5, shape run_means.shape + (6,)."""
+    lam = np.asarray(run_means, dtype=float)[..., None]
+    k   = np.arange(6)
+    pmf = np.exp(-lam) * lam ** k / np.cumprod(np.r_[1, np.arange(1, 6)])
+    return np.cumsum(pmf, axis=-1)
 
-def simulate_match(context, lines=None, iterations=MONTE_CARLO_ITERATIONS, seed=RANDOM_SEED):
-    rng   = np.random.default_rng(seed)
-    lines = lines or {}
+def _wicket_run_means(run_means, wicket_probs):
+    """
+    Per-ball run means by wickets already down, shape (matches, 120, ALL_OUT + 1).
+    Each wicket costs WICKET_RUN_DECAY of the scoring rate; the rates are then
+    scaled so a ball's expected runs, over the wickets-down distribution and
+    including wicket balls and dead balls after an all-out, still equal the
+    phase mean. That distribution comes from a 120-step recursion on an
+    (matches x 11) table, independent of the number of iterations.
+    """
+    multiplier = 1.0 - WICKET_RUN_DECAY * np.arange(ALL_OUT + 1)
+    down       = np.zeros((len(run_means), ALL_OUT + 1))
+    down[:, 0] = 1.0
+    expected   = np.empty(run_means.shape)
+    for b in range(run_means.shape[1]):
+        expected[:, b] = down[:, :ALL_OUT] @ multiplier[:ALL_OUT]
+        falls          = down[:, :ALL_OUT] * wicket_probs[:, b:b + 1]
+        down[:, :ALL_OUT] -= falls
+        down[:, 1:]       += falls
+    scale = run_means / ((1.0 - wicket_probs) * expected)
+    return scale[..., None] * multiplier
 
-    innings1_mean = context.venue_avg_runs + context.run_adjustment
-    innings1_std  = innings1_mean * 0.12
+def _innings_cdf(run_means, wicket_probs):
+    """Per-ball run CDFs by wickets down, shape (matches, balls, ALL_OUT + 1, 6)."""
+    return _clipped_poisson_cdf(_wicket_run_means(run_means, wicket_probs))
 
-    innings1_scores, innings1_session_runs = _simulate_innings(
-        rng=rng, iterations=iterations, mean_total=innings1_mean,
-        std_total=innings1_std, powerplay_mean=context.venue_avg_powerplay,
-        wicket_rate_boost=context.wicket_adjustment,
-    )
+def _simulate_innings(uniforms, run_means, wicket_probs, wickets_down=0, cdf=None):
+    """
+    uniforms: (matches, iterations, balls) U[0,1) draws; run_means, wicket_probs: (matches, balls).
+    A resumed innings passes the remaining balls' wicket_probs and cdf
+    (slices of _innings_cdf for the whole innings) and the wickets_down so far.
+
+    One draw per ball settles both outcomes: u < p is a wicket (no runs);
+    otherwise (u - p) / (1 - p) is uniform again and is inverse-CDF sampled
+    from the clipped Poisson at the rate for the wickets already down.
+    Wickets never depend on runs, so wickets-down before every ball is a
+    single cumsum; balls after the tenth wicket are dead.
+    Returns cumulative runs (int16) and cumulative wickets (int8).
+    """
+    n_matches, _, n_balls = uniforms.shape
+    p       = wicket_probs[:, None, :]
+    is_wkt  = uniforms < p
+    wickets = np.cumsum(is_wkt, axis=2, dtype=np.int8)
+    wickets += np.int8(wickets_down)
+    before  = wickets - is_wkt
+    np.minimum(wickets, ALL_OUT, out=wickets)
+
+    levels = ALL_OUT + 1
+    cdf    = _innings_cdf(run_means, wicket_probs) if cdf is None else cdf
+    cdf    = np.ascontiguousarray(cdf).reshape(n_matches * n_balls * levels, 6)
+    slot   = (np.arange(n_matches, dtype=np.int32)[:, None, None] * n_balls
+              + np.arange(n_balls, dtype=np.int32)) * levels + np.minimum(before, ALL_OUT)
+    u      = (uniforms - p) / (1.0 - p)
+    ball_runs = np.zeros(uniforms.shape, dtype=np.int8)
+    for k in range(6):
+        ball_runs += u >= cdf[:, k][slot]
+    ball_runs *= before < ALL_OUT
+    return np.cumsum(ball_runs, axis=2, dtype=np.int16), wickets
+
+class _UniformSource:
+    """One match's U[0,1) draws for both innings under a sampling mode."""
+
+    def __init__(self, seed, sampling="mc"):
+        if sampling not in SAMPLING_MODES:
+            raise ValueError(f"sampling must be one of {SAMPLING_MODES}, got {sampling!r}")
+        self.sampling = sampling
+        if sampling == "sobol":
+            if qmc is None:
+                raise ImportError("sobol sampling needs scipy: pip install scipy")
+            if isinstance(seed, np.random.SeedSequence):
+                seed = np.random.default_rng(seed)
+            self.sobol = qmc.Sobol(d=240, scramble=True, seed=seed)
+        else:
+            self.rng = np.random.default_rng(seed)
 
+    def fill(self, u1, u2):
+        """Fills two (iterations, 120) blocks, innings 1 and innings 2."""
+        if self.sampling == "sobol":
+            with warnings.catch_warnings():
+                # Sobol balance is best at powers of two; other sizes are still valid
+                warnings.simplefilter("ignore", UserWarning)
+                points = self.sobol.random(len(u1))
+            u1[:], u2[:] = points[:, :120], points[:, 120:]
+        elif self.sampling == "antithetic":
+            n, half = len(u1), (len(u1) + 1) // 2
+            self.rng.random(out=u1[:half])
+            self.rng.random(out=u2[:half])
+            np.subtract(1.0, u1[:n - half], out=u1[half:])
+            np.subtract(1.0, u2[:n - half], out=u2[half:])
+        else:
+            self.rng.random(out=u1)
+            self.rng.random(out=u2)
+
+def _innings_means(context):
+    innings1_mean = context.venue_avg_runs + context.run_adjustment
     dew_boost  = context.dew_risk * 6 if context.match_time in ("day-night", "night") else 0.0
     toss_boost = (context.toss_win_prob_boost * innings1_mean
                   if context.toss_winner == context.team_batting_second else 0.0)
     innings2_mean = innings1_mean * context.venue_chase_advantage * 2 + dew_boost + toss_boost
-    innings2_std  = innings2_mean * 0.12
+    return innings1_mean, innings2_mean
+
+def _match_rates(context):
+    """(run_means, wicket_probs) per ball for each innings, shape (120,) each."""
+    innings1_mean, innings2_mean = _innings_means(context)
+    return (_ball_rates(innings1_mean, context.venue_avg_powerplay, context.wicket_adjustment),
+            _ball_rates(innings2_mean, context.venue_avg_powerplay, 0.0))
+
+def simulate_match(context, lines=None, iterations=MONTE_CARLO_ITERATIONS, seed=RANDOM_SEED,
+                   target_se=None, batch_size=ADAPTIVE_BATCH, sampling="mc", max_cells=MAX_BATCH_CELLS,
+                   shards=None, workers=1):
+    """
+    target_se: stop once the standard error of the win probability and of every
+    session-line probability is at most this, drawing batch_size iterations at
+    a time; iterations is then the cap. result.iterations is the number used.
+    The stopping rule uses the independent-draw standard error, which is
+    conservative for the antithetic and sobol modes.
+
+    Iterations are streamed in blocks of at most max_cells draws per innings
+    and folded into fixed-size histograms, so memory does not grow with
+    iterations: 5M paths run in the same footprint as 30k.
+    shards/workers (module docstring) apply when target_se is None.
+    """
+    if sampling == "exact":
+        from agents.simulation.exact import exact_match   # exact imports this module
+        return exact_match(context, lines)
+    if target_se is None:
+        return simulate_matches([context], lines=lines, iterations=iterations, seeds=seed,
+                                sampling=sampling, max_cells=max_cells,
+                                shards=shards, workers=workers)[0]
+    lines = lines or {}
+    tally = _stream(_match_rates(context), _UniformSource(seed, sampling), iterations,
+                    block=max(1, min(batch_size, max_cells // 120)), lines=lines, target_se=target_se)
+    return _summarize(context, tally, lines)
+
+def simulate_matches(contexts, lines=None, iterations=MONTE_CARLO_ITERATIONS, seeds=RANDOM_SEED,
+                     max_cells=MAX_BATCH_CELLS, sampling="mc", shards=None, workers=1):
+    """
+    Simulates a slate of matches in one vectorized pass per chunk of matches.
 
-    innings2_scores, _ = _simulate_innings(
-        rng=rng, iterations=iterations, mean_total=innings2_mean,
-        std_total=innings2_std, powerplay_mean=context.venue_avg_powerplay,
-        wicket_rate_boost=0.0,
+    contexts: list of MatchContext, or a DataFrame with one MatchContext per row.
+    lines:    one {over: [lines]} dict for every match, or a list with one per match.
+    seeds:    one seed for every match, or a list with one per match.
+    sampling: one of SAMPLING_MODES, or "exact".
+    Chunks hold at most max_cells (matches x iterations x balls) draws per
+    innings; a match too large for one chunk is streamed on its own in blocks.
+    Each match draws from its own generator, so a match's result does not
+    depend on the slate: it equals simulate_match(context, seed=seed) for the
+    same max_cells.
+    shards/workers: see the module docstring. Every (match, shard) pair is one
+    task, so a slate keeps all workers busy even with a single shard.
+    """
+    if isinstance(contexts, pd.DataFrame):
+        contexts = [MatchContext(**row) for row in contexts.to_dict("records")]
+    n     = len(contexts)
+    seeds = list(seeds) if isinstance(seeds, (list, tuple, np.ndarray)) else [seeds] * n
+    lines = list(lines) if isinstance(lines, (list, tuple)) else [lines] * n
+    if sampling == "exact":
+        return [simulate_match(ctx, lines[i], sampling="exact") for i, ctx in enumerate(contexts)]
+    rates = [_match_rates(ctx) for ctx in contexts]
+    if shards:
+        tallies = _sharded_tallies(rates, seeds, iterations, shards, workers, sampling, max_cells)
+        return [_summarize(ctx, tally, lines[i] or {}) for i, (ctx, tally) in
+                enumerate(zip(contexts, tallies))]
+
+    per_chunk = max_cells // (iterations * 120)
+    if not per_chunk:
+        return [_summarize(ctx, _stream(rates[i], _UniformSource(seeds[i], sampling), iterations,
+                                        block=max(1, max_cells // 120)), lines[i] or {})
+                for i, ctx in enumerate(contexts)]
+
+    results = []
+    for start in range(0, n, per_chunk):
+        chunk = range(start, min(n, start + per_chunk))
+        u1 = np.empty((len(chunk), iterations, 120))
+        u2 = np.empty((len(chunk), iterations, 120))
+        for j, i in enumerate(chunk):
+            _UniformSource(seeds[i], sampling).fill(u1[j], u2[j])
+        runs1, wickets1, finals2 = _run_chunk(u1, u2, [rates[i] for i in chunk])
+        for j, i in enumerate(chunk):
+            tally = _Tally()
+            tally.add(runs1[j], wickets1[j], finals2[j])
+            results.append(_summarize(contexts[i], tally, lines[i] or {}))
+    return results
+
+def simulate_scenarios(contexts, lines=None, iterations=MONTE_CARLO_ITERATIONS, seed=RANDOM_SEED,
+                       sampling="mc", common_random_numbers=True, max_cells=MAX_BATCH_CELLS):
+    """
+    Variants of one fixture, e.g. toss bat vs field or with vs without an
+    absent player. With common_random_numbers every variant replays the same
+    draws (drawn once per block and broadcast), so a difference between two
+    results reflects the change in context rather than sampling noise.
+    Without it, variant i uses seed + i.
+    """
+    if not common_random_numbers:
+        return simulate_matches(contexts, lines=lines, iterations=iterations, max_cells=max_cells,
+                                seeds=[seed + i for i in range(len(contexts))], sampling=sampling)
+    source  = _UniformSource(seed, sampling)
+    rates   = [_match_rates(ctx) for ctx in contexts]
+    tallies = [_Tally() for _ in contexts]
+    block   = max(1, max_cells // (len(contexts) * 120))
+    done    = 0
+    while done < iterations:
+        n      = min(block, iterations - done)
+        u1, u2 = np.empty((n, 120)), np.empty((n, 120))
+        source.fill(u1, u2)
+        shape  = (len(contexts), n, 120)
+        runs1, wickets1, finals2 = _run_chunk(np.broadcast_to(u1, shape), np.broadcast_to(u2, shape),
+                                              rates)
+        for j, tally in enumerate(tallies):
+            tally.add(runs1[j], wickets1[j], finals2[j])
+        done += n
+    return [_summarize(ctx, tally, lines or {}) for ctx, tally in zip(contexts, tallies)]
+
+def simulate_live(context, state, lines=None, iterations=MONTE_CARLO_ITERATIONS, seed=RANDOM_SEED,
+                  target_se=None, batch_size=ADAPTIVE_BATCH, max_cells=MAX_BATCH_CELLS):
+    """
+    Simulates only what is left of a match in progress: the rest of innings 1
+    and all of innings 2, or the rest of the chase. context is the pre-match
+    context; the score so far comes from state, not from run_adjustment, so
+    the per-ball rates (_live_rates) are reused across polls. A score already
+    past MAX_RUNS lands in the last histogram bin; the win probability uses
+    the unclipped totals.
+
+    Sessions cover the innings-1 checkpoints still to come. As in
+    simulate_match, the chase wins on a tie. target_se stops early on the
+    win probability's standard error, checked every batch_size iterations.
+    """
+    if state.innings == 2 and state.target is None:
+        raise ValueError("an innings-2 LiveState needs a target")
+    lines   = lines or {}
+    rates   = _live_rates(*_innings_means(context), context.venue_avg_powerplay,
+                          context.wicket_adjustment)
+    rng     = np.random.default_rng(seed)
+    block   = max(1, min(batch_size if target_se else iterations, max_cells // 120))
+    ahead   = [over for over in SESSION_OVERS if state.innings == 1 and over * 6 > state.balls]
+    runs    = {over: np.zeros(MAX_RUNS + 1, np.int64) for over in ahead}
+    wickets = {over: np.zeros(ALL_OUT + 1, np.int64) for over in ahead}
+    final1, final2 = np.zeros(MAX_RUNS + 1, np.int64), np.zeros(MAX_RUNS + 1, np.int64)
+    done = second_wins = 0
+    while done < iterations:
+        n = min(block, iterations - done)
+        if state.innings == 1:
+            cum, wkts = _resume_innings(rng, rates[0], state, n)
+            for over in ahead:
+                runs[over]    += _histogram(cum[:, over * 6 - 1 - state.balls])
+                wickets[over] += np.bincount(wkts[:, over * 6 - 1 - state.balls], minlength=ALL_OUT + 1)
+            total1    = cum[:, -1] if cum.shape[1] else np.full(n, state.runs, np.int16)
+            total2, _ = _resume_innings(rng, rates[1], LiveState(2, 0, 0, 0), n)
+            total2    = total2[:, -1]
+        else:
+            total1    = np.full(n, state.target - 1, np.int16)
+            cum, _    = _resume_innings(rng, rates[1], state, n)
+            total2    = cum[:, -1] if cum.shape[1] else np.full(n, state.runs, np.int16)
+        second_wins += int(np.count_nonzero(total2 >= total1))
+        final1 += _histogram(total1)
+        final2 += _histogram(total2)
+        done   += n
+        p = second_wins / done
+        if target_se is not None and np.sqrt(p * (1 - p) / done) <= target_se:
+            break
+
+    sessions = []
+    for over in ahead:
+        session = ScoreDistribution(runs[over])
+        sessions.append(SessionResult(
+            over=over,
+            mean_runs=round(session.mean, 1),
+            std_runs=round(session.std, 1),
+            prob_over_line={line: session.prob_over(line) for line in lines.get(over, [])},
+            mean_wickets=round(float(wickets[over] @ np.arange(ALL_OUT + 1)) / done, 2),
+            wickets_pmf=(wickets[over] / done).tolist(),
+            distribution=session,
+        ))
+    innings1, innings2 = ScoreDistribution(final1), ScoreDistribution(final2)
+    return SimulationResult(
+        team_batting_first=context.team_batting_first,
+        team_batting_second=context.team_batting_second,
+        win_prob_batting_first=round(1.0 - second_wins / done, 4),
+        win_prob_batting_second=round(second_wins / done, 4),
+        innings1_mean=round(innings1.mean, 1),
+        innings1_std=round(innings1.std, 1),
+        innings2_mean=round(innings2.mean, 1),
+        innings2_std=round(innings2.std, 1),
+        sessions=sessions,
+        iterations=done,
+        innings1_distribution=innings1,
+        innings2_distribution=innings2,
     )
 
-    win_prob_second = float(np.sum(innings2_scores >= innings1_scores)) / iterations
+@lru_cache(maxsize=32)
+def _live_rates(innings1_mean, innings2_mean, powerplay_mean, wicket_rate_boost):
+    """(wicket_probs, run CDFs) for each innings, cached so live polls skip the setup."""
+    rates = []
+    for mean, boost in ((innings1_mean, wicket_rate_boost), (innings2_mean, 0.0)):
+        run_means, wicket_probs = _ball_rates(mean, powerplay_mean, boost)
+        cdf = _innings_cdf(run_means[None], wicket_probs[None])[0]
+        wicket_probs.setflags(write=False)
+        cdf.setflags(write=False)
+        rates.append((wicket_probs, cdf))
+    return tuple(rates)
+
+def _histogram(runs):
+    """Counts of each run total, totals above MAX_RUNS in the last bin."""
+    return np.bincount(np.minimum(runs, MAX_RUNS), minlength=MAX_RUNS + 1)
+
+def _resume_innings(rng, rates, state, n):
+    """
+    n paths of the balls left after state: cumulative runs including the runs
+    so far, and wickets down, shape (n, balls left) each. After an all-out
+    every remaining ball is dead.
+    """
+    wicket_probs, cdf = rates
+    first = min(state.balls, 120)
+    u     = rng.random((1, n, 120 - first))
+    runs, wickets = _simulate_innings(u, None, wicket_probs[None, first:], wickets_down=state.wickets,
+                                      cdf=cdf[None, first:])
+    return runs[0] + np.int16(state.runs), wickets[0]
+
+def _run_chunk(u1, u2, rates):
+    """Both innings for a chunk of matches. Returns innings-1 cumulative runs
+    and wickets, and innings-2 totals."""
+    run1, wkt1 = map(np.stack, zip(*(r[0] for r in rates)))
+    run2, wkt2 = map(np.stack, zip(*(r[1] for r in rates)))
+    runs1, wickets1 = _simulate_innings(u1, run1, wkt1)
+    runs2, _        = _simulate_innings(u2, run2, wkt2)
+    return runs1, wickets1, runs2[:, :, -1]
+
+def _stream(rates, source, iterations, block, lines=None, target_se=None):
+    """Simulates one match block by block into a _Tally, stopping early at target_se."""
+    tally = _Tally()
+    while tally.iterations < iterations:
+        n      = min(block, iterations - tally.iterations)
+        u1, u2 = np.empty((1, n, 120)), np.empty((1, n, 120))
+        source.fill(u1[0], u2[0])
+        runs1, wickets1, finals2 = _run_chunk(u1, u2, [rates])
+        tally.add(runs1[0], wickets1[0], finals2[0])
+        if target_se is not None and tally.max_standard_error(lines) <= target_se:
+            break
+    return tally
+
+def _sharded_tallies(rates, seeds, iterations, shards, workers, sampling, max_cells):
+    """One merged _Tally per match from shards of its iterations, in-process or on a pool."""
+    sizes = [iterations // shards + (k < iterations % shards) for k in range(shards)]
+    tasks = []
+    for i, seed in enumerate(seeds):
+        streams = np.random.SeedSequence(seed).spawn(shards)
+        tasks.extend((rates[i], stream, size, sampling, max_cells)
+                     for stream, size in zip(streams, sizes) if size)
+    if not workers or workers <= 1:
+        parts = list(map(_simulate_shard, tasks))
+    else:
+        with ProcessPoolExecutor(max_workers=workers) as pool:
+            parts = list(pool.map(_simulate_shard, tasks))
+
+    per_match = len(parts) // len(seeds)
+    tallies   = []
+    for i in range(len(seeds)):
+        tally = _Tally()
+        for part in parts[i * per_match:(i + 1) * per_match]:
+            tally.merge(part)
+        tallies.append(tally)
+    return tallies
+
+def _simulate_shard(task):
+    rates, stream, iterations, sampling, max_cells = task
+    return _stream(rates, _UniformSource(stream, sampling), iterations, block=max(1, max_cells // 120))
+
+class _Tally:
+    """Histograms one match's iterations are folded into, block by block."""
+
+    def __init__(self):
+        self.iterations  = 0
+        self.second_wins = 0
+        self.runs        = {over: np.zeros(MAX_RUNS + 1, np.int64) for over in CHECKPOINTS}
+        self.wickets     = {over: np.zeros(ALL_OUT + 1, np.int64) for over in CHECKPOINTS}
+        self.innings2    = np.zeros(MAX_RUNS + 1, np.int64)
+
+    def add(self, innings1_cumulative, innings1_wickets, innings2_scores):
+        self.iterations  += len(innings2_scores)
+        self.second_wins += int(np.count_nonzero(innings2_scores >= innings1_cumulative[:, -1]))
+        for over in CHECKPOINTS:
+            self.runs[over]    += np.bincount(innings1_cumulative[:, over * 6 - 1], minlength=MAX_RUNS + 1)
+            self.wickets[over] += np.bincount(innings1_wickets[:, over * 6 - 1], minlength=ALL_OUT + 1)
+        self.innings2 += np.bincount(innings2_scores, minlength=MAX_RUNS + 1)
+
+    def merge(self, other):
+        self.iterations  += other.iterations
+        self.second_wins += other.second_wins
+        for over in CHECKPOINTS:
+            self.runs[over]    += other.runs[over]
+            self.wickets[over] += other.wickets[over]
+        self.innings2 += other.innings2
+        return self
+
+    def max_standard_error(self, lines):
+        """Largest binomial standard error among the win and session-line probabilities."""
+        probs = [self.second_wins / self.iterations]
+        for over, over_lines in lines.items():
+            if over in self.runs:
+                session = ScoreDistribution(self.runs[over])
+                probs.extend(session.prob_over(line) for line in over_lines)
+        probs = np.array(probs)
+        return float(np.sqrt(probs * (1 - probs) / self.iterations).max())
+
+def _summarize(context, tally, lines):
+    n        = tally.iterations
+    innings1 = ScoreDistribution(tally.runs[20])
+    innings2 = ScoreDistribution(tally.innings2)
+    win_prob_second = tally.second_wins / n
     win_prob_first  = 1.0 - win_prob_second
 
     sessions = []
     for over in SESSION_OVERS:
-        session_runs = innings1_session_runs[over]
-        prob_map = {line: float(np.mean(session_runs > line)) for line in lines.get(over, [])}
+        session = ScoreDistribution(tally.runs[over])
+        wickets = tally.wickets[over]
         sessions.append(SessionResult(
             over=over,
-            mean_runs=round(float(np.mean(session_runs)), 1),
-            std_runs=round(float(np.std(session_runs)), 1),
-            prob_over_line=prob_map,
+            mean_runs=round(session.mean, 1),
+            std_runs=round(session.std, 1),
+            prob_over_line={line: session.prob_over(line) for line in lines.get(over, [])},
+            mean_wickets=round(float(wickets @ np.arange(ALL_OUT + 1)) / n, 2),
+            wickets_pmf=(wickets / n).tolist(),
+            distribution=session,
         ))
 
     return SimulationResult(
@@ -86,10 +559,12 @@ def simulate_match(context, lines=None, iterations=MONTE_CARLO_ITERATIONS, seed=
         team_batting_second=context.team_batting_second,
         win_prob_batting_first=round(win_prob_first, 4),
         win_prob_batting_second=round(win_prob_second, 4),
-        innings1_mean=round(float(np.mean(innings1_scores)), 1),
-        innings1_std=round(float(np.std(innings1_scores)), 1),
-        innings2_mean=round(float(np.mean(innings2_scores)), 1),
-        innings2_std=round(float(np.std(innings2_scores)), 1),
+        innings1_mean=round(innings1.mean, 1),
+        innings1_std=round(innings1.std, 1),
+        innings2_mean=round(innings2.mean, 1),
+        innings2_std=round(innings2.std, 1),
         sessions=sessions,
-        iterations=iterations,
+        iterations=n,
+        innings1_distribution=innings1,
+        innings2_distribution=innings2,
     )
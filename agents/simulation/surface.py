@@ -0,0 +1,202 @@
+"""
+Precomputed win-probability surfaces for in-play pricing.
+
+The ball model depends on a match only through the projected innings means
+and the venue's powerplay mean: chase advantage, dew and the toss boost all
+enter through the innings-2 mean (monte_carlo._innings_means). So per venue
+the exact engine is run once over a grid of means, and the surface stores
+
+  win_prob[i, j]         P(batting first wins | innings-1 mean = grid[i],
+                         innings-2 mean = grid[j])
+  quantiles[c, i, q]     innings-1 score quantile QUANTILE_LEVELS[q] at the
+                         end of checkpoint over c, innings-1 mean = grid[i]
+
+as float32 in one .npz file. Lookups interpolate (bilinear for win_prob,
+linear for quantiles) and cost a few microseconds. Both innings share the
+ball model's PMFs, so the over-20 quantiles at the innings-2 mean describe
+innings 2 as well. build_surface() also
+evaluates the exact engine at every cell centre, where interpolation error
+is largest, and records the worst miss per venue as max_error; the exact
+engine itself matches simulate_match to within sampling noise.
+
+Contexts the surface does not describe (an unknown venue, a powerplay mean
+that differs from the build, a wicket_adjustment, means off the grid) are
+reported by covers(), and callers fall back to simulation.
+"""
+import numpy as np
+
+from agents.simulation.distribution import MAX_RUNS, ScoreDistribution
+from agents.simulation.exact import innings_pmfs
+from agents.simulation.monte_carlo import (
+    CHECKPOINTS, ENGINE_VERSION, SessionResult, SimulationResult, _ball_rates, _innings_means,
+)
+from config.settings import SESSION_OVERS, WIN_SURFACE_PATH
+
+MEAN_GRID       = np.arange(60.0, 301.0, 5.0)
+QUANTILE_LEVELS = np.round(np.arange(0.05, 0.951, 0.05), 2)
+
+def _profile(powerplay, means):
+    """Final-score PMFs for each mean (both innings share them) and innings-1 checkpoint CDFs."""
+    rates = [_ball_rates(m, powerplay, 0.0) for m in means]
+    pmfs  = innings_pmfs(np.stack([r[0] for r in rates]), np.stack([r[1] for r in rates]),
+                         checkpoints=CHECKPOINTS)
+    final = pmfs[20].sum(axis=1)
+    cdfs  = {over: np.cumsum(pmfs[over].sum(axis=1), axis=1) for over in CHECKPOINTS}
+    return final, cdfs
+
+def _win_first(final1, final2):
+    """P(batting first wins) for every (innings-1 PMF, innings-2 PMF) pair; ties go to the chase."""
+    at_least = 1.0 - np.concatenate([np.zeros((len(final2), 1)), np.cumsum(final2, axis=1)[:, :-1]],
+                                    axis=1)
+    return 1.0 - final1 @ at_least.T
+
+def _cells(x, grid=MEAN_GRID):
+    """Grid cell and fraction within it for each value in x."""
+    f = (np.asarray(x) - grid[0]) / (grid[1] - grid[0])
+    i = np.clip(np.floor(f).astype(int), 0, len(grid) - 2)
+    return i, f - i
+
+def _bilinear(table, i, tx, j, ty):
+    """table (grid x grid) interpolated in cells (i, j) at fractions (tx, ty); scalars or arrays."""
+    return ((1 - tx) * ((1 - ty) * table[i, j] + ty * table[i, j + 1])
+            + tx * ((1 - ty) * table[i + 1, j] + ty * table[i + 1, j + 1]))
+
+def _quantile_distribution(values, levels):
+    """
+    A ScoreDistribution whose CDF runs linearly through (values[k], levels[k]),
+    with the two tails as wide as their neighbouring bands. Score r holds
+    CDF(r + 0.5) - CDF(r - 0.5), so prob_over(x.5) reads the CDF at x.5.
+    """
+    lo    = values[0] - (values[1] - values[0]) * levels[0] / (levels[1] - levels[0])
+    hi    = values[-1] + (values[-1] - values[-2]) * (1 - levels[-1]) / (levels[-1] - levels[-2])
+    knots = np.concatenate([[lo], values, [hi]])
+    cdf   = np.interp(np.arange(MAX_RUNS + 2) - 0.5, knots, np.concatenate([[0.0], levels, [1.0]]))
+    return ScoreDistribution(np.diff(cdf))
+
+class WinSurface:
+    def __init__(self, venues, powerplay, win_prob, quantiles, max_error,
+                 grid=MEAN_GRID, levels=QUANTILE_LEVELS):
+        self.venues    = list(venues)
+        self.index     = {v: k for k, v in enumerate(self.venues)}
+        self.powerplay = np.asarray(powerplay, dtype=float)
+        self.win_prob  = np.asarray(win_prob)      # (venues, grid, grid)
+        self.quantiles = np.asarray(quantiles)     # (venues, checkpoints, grid, levels)
+        self.max_error = np.asarray(max_error)     # (venues,)
+        self.grid      = np.asarray(grid, dtype=float)
+        self.levels    = np.asarray(levels, dtype=float)
+        self._lo       = float(self.grid[0])
+        self._step     = float(self.grid[1] - self.grid[0])
+        self._cells    = len(self.grid) - 1
+        self._level    = {round(float(q), 4): k for k, q in enumerate(self.levels)}
+
+    def __repr__(self):
+        return (f"WinSurface({len(self.venues)} venues, {len(self.grid)}x{len(self.grid)} grid, "
+                f"max_error={float(self.max_error.max()):.4f})")
+
+    def _cell(self, x):
+        f = (x - self._lo) / self._step
+        i = min(max(int(f), 0), self._cells - 1)
+        return i, f - i
+
+    def win_prob_first(self, venue, innings1_mean, innings2_mean):
+        """P(batting first wins), bilinear in the two innings means."""
+        return float(_bilinear(self.win_prob[self.index[venue]], *self._cell(innings1_mean),
+                               *self._cell(innings2_mean)))
+
+    def score_quantile(self, venue, over, q, innings1_mean):
+        """Innings-1 score at checkpoint over with cumulative probability q (a QUANTILE_LEVELS entry)."""
+        row   = self.quantiles[self.index[venue], CHECKPOINTS.index(over)]
+        level = self._level[round(q, 4)]
+        i, t  = self._cell(innings1_mean)
+        return float((1 - t) * row[i, level] + t * row[i + 1, level])
+
+    def distribution(self, venue, over, innings1_mean):
+        """Innings-1 runs at checkpoint over, rebuilt from the interpolated quantiles."""
+        row  = self.quantiles[self.index[venue], CHECKPOINTS.index(over)]
+        i, t = self._cell(innings1_mean)
+        return _quantile_distribution((1 - t) * row[i] + t * row[i + 1], self.levels)
+
+    def covers(self, context):
+        """True when the surface describes context exactly, up to interpolation."""
+        k = self.index.get(context.venue)
+        if k is None or context.wicket_adjustment or \
+                abs(context.venue_avg_powerplay - self.powerplay[k]) > 1e-9:
+            return False
+        lo, hi = self.grid[0], self.grid[-1]
+        return all(lo <= m <= hi for m in _innings_means(context))
+
+    def match(self, context):
+        """
+        A SimulationResult from the surface (iterations=0). Score
+        distributions are rebuilt from the stored quantiles, so prob_over,
+        quantile and with_lines work as on a simulated result, to within the
+        quantile spacing. There are no wicket figures.
+        """
+        innings1_mean, innings2_mean = _innings_means(context)
+        win_first = self.win_prob_first(context.venue, innings1_mean, innings2_mean)
+        final1    = self.distribution(context.venue, 20, innings1_mean)
+        final2    = self.distribution(context.venue, 20, innings2_mean)
+        sessions  = []
+        for over in SESSION_OVERS:
+            session = final1 if over == 20 else self.distribution(context.venue, over, innings1_mean)
+            sessions.append(SessionResult(over=over, mean_runs=round(session.mean, 1),
+                                          std_runs=round(session.std, 1), distribution=session))
+        return SimulationResult(
+            team_batting_first=context.team_batting_first,
+            team_batting_second=context.team_batting_second,
+            win_prob_batting_first=round(win_first, 4),
+            win_prob_batting_second=round(1.0 - win_first, 4),
+            innings1_mean=round(final1.mean, 1),
+            innings1_std=round(final1.std, 1),
+            innings2_mean=round(final2.mean, 1),
+            innings2_std=round(final2.std, 1),
+            sessions=sessions,
+            iterations=0,
+            innings1_distribution=final1,
+            innings2_distribution=final2,
+        )
+
+    def save(self, path=WIN_SURFACE_PATH):
+        path.parent.mkdir(parents=True, exist_ok=True)
+        np.savez_compressed(path, engine_version=ENGINE_VERSION, venues=np.array(self.venues),
+                            powerplay=self.powerplay, win_prob=self.win_prob,
+                            quantiles=self.quantiles, max_error=self.max_error,
+                            grid=self.grid, levels=self.levels)
+
+    @classmethod
+    def load(cls, path=WIN_SURFACE_PATH):
+        """The saved surface, or None if it is missing or from another engine version."""
+        if not path.exists():
+            return None
+        with np.load(path) as data:
+            if int(data["engine_version"]) != ENGINE_VERSION:
+                return None
+            return cls(data["venues"].tolist(), data["powerplay"], data["win_prob"],
+                       data["quantiles"], data["max_error"], data["grid"], data["levels"])
+
+def build_surface(venue_powerplay, grid=MEAN_GRID, levels=QUANTILE_LEVELS):
+    """
+    venue_powerplay: {venue: powerplay mean}. Venues with the same powerplay
+    mean share one exact-engine pass over the grid.
+    """
+    centres  = (grid[:-1] + grid[1:]) / 2
+    profiles = {}
+    for powerplay in sorted(set(venue_powerplay.values())):
+        final, cdfs = _profile(powerplay, grid)
+        table       = _win_first(final, final)
+        mid, _      = _profile(powerplay, centres)
+        cx, cy      = np.meshgrid(centres, centres, indexing="ij")
+        error       = np.abs(_bilinear(table, *_cells(cx, grid), *_cells(cy, grid))
+                             - _win_first(mid, mid)).max()
+        quantiles   = np.stack([[np.searchsorted(cdf, levels - 1e-9) for cdf in cdfs[over]]
+                                for over in CHECKPOINTS])
+        profiles[powerplay] = (table, quantiles, error)
+
+    venues = list(venue_powerplay)
+    return WinSurface(
+        venues, [venue_powerplay[v] for v in venues],
+        np.stack([profiles[venue_powerplay[v]][0] for v in venues]).astype(np.float32),
+        np.stack([profiles[venue_powerplay[v]][1] for v in venues]).astype(np.float32),
+        np.array([profiles[venue_powerplay[v]][2] for v in venues]),
+        grid, levels,
+    )
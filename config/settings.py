@@ -11,6 +11,14 @@ ROOT_DIR        = Path(__file__).parent.parent
 DATA_RAW        = ROOT_DIR / "data" / "raw"
 DATA_PROCESSED  = ROOT_DIR / "data" / "processed"
 DATA_MODELS     = ROOT_DIR / "data" / "models"
+PARSE_CACHE_DIR = DATA_PROCESSED / "parse_cache"
+DATA_STORE      = DATA_PROCESSED / "store"
+BALL_ARRAYS_DIR = DATA_PROCESSED / "ball_arrays"
+PLAYER_INDEX_PATH = DATA_PROCESSED / "player_index.json"
+MODEL_STATE_PATH  = DATA_MODELS / "model_state.json"
+GENERATED_SETTINGS_PATH = DATA_MODELS / "generated_settings.json"
+SIM_CACHE_DIR     = DATA_PROCESSED / "sim_cache"
+WIN_SURFACE_PATH  = DATA_MODELS / "win_surface.npz"
 CRICSHEET_ZIP   = DATA_RAW / "ipl_all.zip"
 CRICSHEET_URL   = "https://cricsheet.org/downloads/ipl_json.zip"
 OPENWEATHER_API_KEY = os.getenv("OPENWEATHER_API_KEY", "")
@@ -18,6 +26,8 @@ OPENWEATHER_API_KEY = os.getenv("OPENWEATHER_API_KEY", "")
 # All averages from real Cricsheet data: 1169 matches, 278,205 deliveries
 # chase_advantage = fraction of time chasing team wins (from toss model)
 # dew_risk = 0.0 (none) to 1.0 (extreme) based on city + match conditions
+# build_models.py regenerates the data-derived fields (and the toss boosts
+# below) into GENERATED_SETTINGS_PATH; the context engine prefers those.
 
 VENUES = {
     "Wankhede Stadium, Mumbai":     {"city":"Mumbai",    "lat":18.9388,"lon":72.8258,"dew_risk":0.85,"chase_advantage":0.591,"avg_first_innings_t20":177,"avg_powerplay_runs":54},
@@ -92,3 +102,6 @@ STAR_BATTER_ABSENCE_RUN_PENALTY  = 12
 STAR_BOWLER_ABSENCE_WICKET_BOOST = 0.08
 MONTE_CARLO_ITERATIONS           = 10_000
 RANDOM_SEED                      = 42
+SIM_CACHE_MEMORY_ENTRIES         = 128
+SIM_CACHE_DISK_ENTRIES           = 1_000
+SIM_CACHE_TTL_SECONDS            = 12 * 3600
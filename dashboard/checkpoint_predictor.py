@@ -13,10 +13,14 @@ Compares vs bookmaker live odds and flags EV in real time.
 Usage:
     python dashboard/checkpoint_predictor.py
 """
-import sys, numpy as np
+import sys, numpy as np, pandas as pd
 from pathlib import Path
 sys.path.insert(0, str(Path(__file__).parent.parent))
 
+from agents.simulation.distribution import ScoreDistribution
+from agents.market_edge.ev_detector import BOOK_COLUMNS
+from agents.market_edge.odds_book import OddsBook
+
 # ── BOOKMAKER LINES — update each match ──────────────────────
 LINES = {
     6:  [47.0, 51.0],       # 6 over session lines
@@ -48,82 +52,89 @@ def simulate_from_here(
     wickets: int,
     overs:   float,
     rng:     np.random.Generator,
+    iterations: int = ITERATIONS,
 ) -> np.ndarray:
     """
-    Simulate ITERATIONS innings completions from current state.
-    Returns array of (score_at_6, score_at_10, score_at_15, score_at_20).
+    Simulate `iterations` innings completions from current state, advancing
+    every path one over at a time.
+    Returns an (iterations, 20) array: column k is the cumulative score at
+    the end of over k + 1. Overs already completed are NaN, except the one
+    that has just ended, which holds the current score.
     """
-    bd       = balls_done(overs)
-    balls_left = TOTAL_OVERS * 6 - bd
+    bd         = balls_done(overs)
     current_rr = (runs / bd * 6) if bd > 0 else 8.0
+    current_over, partial = divmod(bd, 6)
 
-    # Phase-based run rates (balls 1-120)
-    # We only simulate from current ball onwards
-    current_over = int(overs)
+    results = np.full((iterations, TOTAL_OVERS), np.nan)
+    if 0 < bd <= TOTAL_OVERS * 6 and partial == 0:
+        results[:, current_over - 1] = runs
 
-    results = np.zeros((ITERATIONS, 4))  # cols: ov6, ov10, ov15, ov20
+    score = np.full(iterations, float(runs))
+    wkts  = np.full(iterations, min(wickets, 10))
+    for ov in range(current_over, TOTAL_OVERS):
+        # Powerplay mean: 9.0, Middle: 7.5, Death: 10.5
+        phase_mean = 9.0 if ov < 6 else 7.5 if ov < 15 else 10.5
+        # Only the unbowled part of a partly bowled over is left to simulate
+        left = (6 - partial) / 6 if ov == current_over else 1.0
+
+        # Blend current RR with phase mean (mean reversion), penalise wickets down
+        blend_rr     = current_rr * 0.3 + phase_mean * 0.7
+        effective_rr = np.maximum(4.0, blend_rr * (1.0 - wkts * 0.045))
+        over_runs    = rng.normal(effective_rr * left, 2.8 * np.sqrt(left)).astype(int)
+        batting      = wkts < 10
+        score       += np.clip(over_runs, 0, 36) * batting   # cap at 6 sixes
+
+        # Wicket probability increases as game progresses; all out stops scoring
+        wkt_prob = (0.10 + wkts * 0.008) * left
+        wkts     = np.minimum(wkts + ((rng.random(iterations) < wkt_prob) & batting), 10)
+        results[:, ov] = score
 
-    for i in range(ITERATIONS):
-        score     = runs
-        wkts      = wickets
-        over_scores = []
+    return results
 
-        # Regress current RR toward phase mean
-        # Powerplay mean: 9.0, Middle: 7.5, Death: 10.5
-        for ov in range(current_over, TOTAL_OVERS):
-            if ov < 6:
-                phase_mean = 9.0
-            elif ov < 15:
-                phase_mean = 7.5
-            else:
-                phase_mean = 10.5
-
-            # Blend current RR with phase mean (mean reversion)
-            blend_rr = current_rr * 0.3 + phase_mean * 0.7
-            wicket_penalty = 1.0 - (wkts * 0.045)
-            effective_rr   = max(4.0, blend_rr * wicket_penalty)
-
-            # Simulate this over
-            over_runs = max(0, int(rng.normal(effective_rr, 2.8)))
-            over_runs = min(over_runs, 36)  # cap at 6 sixes
-            score    += over_runs
-
-            # Wicket probability increases as game progresses
-            wkt_prob = 0.10 + (wkts * 0.008)
-            if rng.random() < wkt_prob:
-                wkts = min(wkts + 1, 10)
-
-            if wkts >= 10:
-                # All out — pad remaining overs with 0
-                for remaining in range(ov + 1, TOTAL_OVERS):
-                    over_scores.append(0)
-                break
 
-            over_scores.append(over_runs)
-
-        # Reconstruct cumulative at checkpoints
-        cum = runs
-        cum_by_over = {}
-        for ov_idx, ov_runs in enumerate(over_scores):
-            cum += ov_runs
-            actual_over = current_over + ov_idx + 1
-            cum_by_over[actual_over] = cum
-
-        # Fill checkpoints
-        for col_idx, checkpoint in enumerate([6, 10, 15, 20]):
-            if checkpoint <= current_over:
-                # Already passed — use actual score if we have it
-                results[i][col_idx] = runs  # approximate
-            else:
-                results[i][col_idx] = cum_by_over.get(checkpoint, score)
+def checkpoint_distributions(results, overs=None):
+    """
+    {over: ScoreDistribution} for the LINES checkpoints and the final over
+    (or the given overs) still to come, or just ended, in simulate_from_here()
+    results, so each line is a lookup, not a scan.
+    """
+    overs = sorted(set(LINES) | {TOTAL_OVERS}) if overs is None else overs
+    return {over: ScoreDistribution.from_scores(results[:, over - 1].astype(np.int64))
+            for over in overs if not np.isnan(results[:, over - 1]).any()}
 
-    return results
+
+def bookie_book():
+    """LINES priced at BOOKIE_ODDS as odds-book rows."""
+    rows = [("book", "session_runs", side, over, line, BOOKIE_ODDS[over][side])
+            for over, lines in LINES.items() for line in lines for side in ("over", "under")]
+    return OddsBook(pd.DataFrame(rows, columns=BOOK_COLUMNS))
 
 
-def print_predictions(runs, wickets, overs, results):
+def line_probabilities(book, dists):
+    """Model probability of each book row; NaN once its over has passed."""
+    probs = []
+    for row in book.book.itertuples(index=False):
+        dist = dists.get(int(row.over))
+        p    = dist.prob_over(row.line) if dist else np.nan
+        probs.append(1.0 - p if row.selection == "under" else p)
+    return np.array(probs)
+
+
+def print_events(events):
+    for event in events:
+        _, _, side, over, line = event.key
+        edge = "over passed" if np.isnan(event.edge_percent) else f"edge {event.edge_percent:+.1f}%"
+        print(f"  ↯ {event.kind:<11} {side.upper():5s} {line} at {over:.0f}  "
+              f"{event.previous or '—'} → {event.strength or '—'}  ({edge})")
+
+
+def print_predictions(runs, wickets, overs, results, book=None):
+    dists  = checkpoint_distributions(results)
+    book   = bookie_book() if book is None else book
+    events = book.reprice(line_probabilities(book, dists))
+    scan   = book.scan()
     bd = balls_done(overs)
     rr = round(runs / bd * 6, 2) if bd > 0 else 0
-    current_over = int(overs)
 
     print(f"\n{'═'*62}")
     print(f"  📊 CHECKPOINT PREDICTOR | {runs}/{wickets} after {overs} overs | RR {rr}")
@@ -131,54 +142,45 @@ def print_predictions(runs, wickets, overs, results):
     print(f"  {'Checkpoint':<12} {'Model Mean':>10} {'Bookie Line':>12} {'P(Over)':>9} {'P(Under)':>9} {'Edge':>8} {'BET'}")
     print(f"  {'-'*12} {'-'*10} {'-'*12} {'-'*9} {'-'*9} {'-'*8} {'-'*12}")
 
-    checkpoint_cols = {6: 0, 10: 1, 15: 2, 20: 3}
-
-    for checkpoint, col in checkpoint_cols.items():
-        if checkpoint < current_over:
+    for checkpoint in LINES:
+        if checkpoint not in dists:
             continue  # Already passed
-
-        col_data = results[:, col]
-        model_mean = np.mean(col_data)
-
-        bk_implied_over  = 1.0 / BOOKIE_ODDS[checkpoint]["over"]
-        bk_implied_under = 1.0 / BOOKIE_ODDS[checkpoint]["under"]
+        dist       = dists[checkpoint]
+        model_mean = dist.mean
 
         for line in LINES.get(checkpoint, []):
-            p_over  = np.mean(col_data > line)
-            p_under = 1.0 - p_over
-
-            edge_over  = p_over  - bk_implied_over
-            edge_under = p_under - bk_implied_under
+            over_row  = scan.iloc[book.rows[("book", "session_runs", "over", checkpoint, line)]]
+            under_row = scan.iloc[book.rows[("book", "session_runs", "under", checkpoint, line)]]
+            p_over, p_under = over_row.model_prob, under_row.model_prob
 
-            best_edge = max(edge_over, edge_under)
-            if edge_over > edge_under:
-                direction = f"OVER  {line:.0f}"
-                edge_pct  = edge_over * 100
-                ev        = edge_over * (BOOKIE_ODDS[checkpoint]["over"] - 1) * 1000 - (1 - p_over) * 1000 * (1 - edge_over)
+            if over_row.edge_percent > under_row.edge_percent:
+                direction, best = f"OVER  {line:.0f}", over_row
             else:
-                direction = f"UNDER {line:.0f}"
-                edge_pct  = edge_under * 100
-                ev        = edge_under * (BOOKIE_ODDS[checkpoint]["under"] - 1) * 1000 - (1 - p_under) * 1000 * (1 - edge_under)
+                direction, best = f"UNDER {line:.0f}", under_row
+            edge_pct = best.edge_percent
 
-            if edge_pct > 8:
+            if best.strength == "strong":
                 signal = f"🔥 STRONG"
-            elif edge_pct > 4:
+            elif best.strength == "moderate":
                 signal = f"✅ LEAN"
             else:
                 signal = f"— skip"
 
             print(f"  Ov {checkpoint:<8} {model_mean:>10.0f} {line:>12.1f} {p_over:>9.1%} {p_under:>9.1%} {edge_pct:>+7.1f}% {signal} {direction}")
 
+    if events:
+        print()
+        print_events(events)
+
     # Summary projection
-    final_scores = results[:, 3]
+    final = dists[TOTAL_OVERS]
     print(f"\n  FINAL INNINGS PROJECTION:")
-    print(f"    Mean  : {np.mean(final_scores):.0f}")
-    print(f"    Median: {np.median(final_scores):.0f}")
-    print(f"    10th % : {np.percentile(final_scores, 10):.0f}  (bad day)")
-    print(f"    90th % : {np.percentile(final_scores, 90):.0f}  (good day)")
-    print(f"    P(>158): {np.mean(final_scores > 158):.1%}")
-    print(f"    P(>170): {np.mean(final_scores > 170):.1%}")
-    print(f"    P(>182): {np.mean(final_scores > 182):.1%}")
+    print(f"    Mean  : {final.mean:.0f}")
+    print(f"    Median: {final.quantile(0.5):.0f}")
+    print(f"    10th % : {final.quantile(0.10):.0f}  (bad day)")
+    print(f"    90th % : {final.quantile(0.90):.0f}  (good day)")
+    for line in (158, 170, 182):
+        print(f"    P(>{line}): {final.prob_over(line):.1%}")
     print(f"{'═'*62}\n")
 
 
@@ -188,9 +190,11 @@ def main():
     print("\n╔══════════════════════════════════════════════════════════╗")
     print("║  MATCHPREDICTOR — CHECKPOINT PREDICTOR (Punter Mode)    ║")
     print("║  Format: runs/wickets overs  e.g.  54/1 6.0             ║")
+    print("║  Price move: odds 6 over 1.95                            ║")
     print("║  Type 'q' to quit                                        ║")
     print("╚══════════════════════════════════════════════════════════╝\n")
 
+    book = bookie_book()
     while True:
         try:
             raw = input("  Score > ").strip()
@@ -198,6 +202,12 @@ def main():
                 break
 
             parts = raw.split()
+            if len(parts) == 4 and parts[0] == "odds":
+                # A checkpoint's price applies to all its lines; only those rows are recomputed
+                over, side, price = int(parts[1]), parts[2], float(parts[3])
+                BOOKIE_ODDS[over][side] = price
+                print_events(book.apply(("session_runs", side, price, over, line) for line in LINES[over]))
+                continue
             if len(parts) != 2:
                 print("  Format: 54/1 6.0")
                 continue
@@ -210,9 +220,9 @@ def main():
             # Run simulation from current state
             rng2    = np.random.default_rng()
             results = simulate_from_here(runs, wickets, overs, rng2)
-            print_predictions(runs, wickets, overs, results)
+            print_predictions(runs, wickets, overs, results, book)
 
-        except (ValueError, IndexError):
+        except (ValueError, IndexError, KeyError):
             print("  Format: runs/wickets overs  e.g.  4/0 1.0")
         except KeyboardInterrupt:
             print("\n  Stopped.")
@@ -16,9 +16,12 @@ from datetime import datetime
 sys.path.insert(0, str(Path(__file__).parent.parent))
 
 from bs4 import BeautifulSoup
-from agents.simulation.monte_carlo import simulate_match
+from agents.simulation.monte_carlo import LiveState, simulate_live, simulate_match
+from agents.simulation.surface import WinSurface
+from agents.simulation.chase import chase_match
 from agents.context_engine.context import build_match_context
-from agents.market_edge.ev_detector import detect_ev
+from agents.market_edge.ev_detector import ev_signals, model_probabilities, odds_book
+from agents.market_edge.odds_book import OddsBook
 
 HEADERS = {
     "User-Agent": (
@@ -52,7 +55,42 @@ LIVE_ODDS = {
 # Cricbuzz match URL — find from cricbuzz.com/live-cricket-scores
 CRICBUZZ_URL = "https://www.cricbuzz.com/live-cricket-scores/108021/wi-vs-zim-44th-match-super-eights-icc-mens-t20-world-cup-2026"
 
-POLL_INTERVAL = 15   # seconds between updates
+POLL_INTERVAL  = 15     # seconds between updates
+LIVE_TARGET_SE = 0.01   # stop simulating once win prob is within ±1% (1 s.e.)
+CHASE_TARGET   = None   # set to the target once innings 2 starts
+LIVE_PRICING   = "resume"   # innings 1: "resume" simulates the balls left, "surface" interpolates
+
+
+_surface = None
+
+def win_surface():
+    """The prebuilt surface (scripts/build_surface.py), loaded once; None if absent."""
+    global _surface
+    if _surface is None:
+        _surface = WinSurface.load() or False
+    return _surface or None
+
+
+_book = None
+
+def live_book(sim):
+    """
+    The OddsBook over LIVE_ODDS, built on first use and repriced with sim.
+    Returns (book, events): only signals that appeared, disappeared or
+    changed strength are events.
+    """
+    global _book
+    if _book is None:
+        _book = OddsBook(odds_book(sim, LIVE_ODDS))
+    return _book, _book.reprice(model_probabilities(sim, _book.book))
+
+
+def print_events(events):
+    for event in events:
+        _, market, selection, over, line = event.key
+        label = selection if over is None else f"{selection} {line} at {over:.0f} overs"
+        print(f"    ↯ {event.kind:<11} {label}  {event.previous or '—'} → {event.strength or '—'}"
+              f"  (edge {event.edge_percent:+.1f}% @ {event.odds:.2f})")
 
 
 # ── Live state ────────────────────────────────────────────────
@@ -123,10 +161,14 @@ def required_rate(runs_scored, wickets, overs_done, target=None):
     return round(needed / balls * 6, 2) if balls > 0 else 99.9
 
 
-def live_win_probability(runs, wickets, overs, innings=1):
+def live_win_probability(runs, wickets, overs, innings=1, target=None):
     """
     Recalculate win probability given current match state.
-    Uses projection: remaining_runs ~ N(projected_mean, std)
+    Innings 1 resumes the simulation from the current ball (LIVE_PRICING
+    "resume"), or projects remaining_runs from the run rate and reads the
+    win surface ("surface").
+    Innings 2 with a target reads the chase table at (runs needed, balls
+    left, wickets in hand), so every ball moves the price.
     """
     ctx = build_match_context(
         venue=MATCH_CONFIG["venue"],
@@ -140,10 +182,18 @@ def live_win_probability(runs, wickets, overs, innings=1):
     ctx.venue_avg_runs    = MATCH_CONFIG["venue_avg_override"]
     ctx.dew_risk          = MATCH_CONFIG["dew_risk_override"]
     ctx.venue_chase_advantage = 0.45
+    balls_done = 120 - balls_remaining(overs)
+
+    if innings == 1 and LIVE_PRICING == "resume":
+        # Pre-match context: the score lives in the LiveState, so the per-ball
+        # rates are reused across polls and only the balls left are simulated
+        ctx.run_adjustment = ctx.dew_risk * 4 + 160 * (ctx.stage_run_multiplier - 1)
+        sim = simulate_live(ctx, LiveState(1, runs, wickets, balls_done),
+                            iterations=5000, target_se=LIVE_TARGET_SE)
+        return sim, ctx, sim.innings1_mean
 
     if innings == 1:
         # Project final score from current run rate
-        balls_done = int(overs) * 6 + round((overs - int(overs)) * 10)
         if balls_done == 0:
             run_rate = 8.0
         else:
@@ -158,8 +208,16 @@ def live_win_probability(runs, wickets, overs, innings=1):
         ctx.run_adjustment = projected_total - ctx.venue_avg_runs + (ctx.dew_risk * 4)
     else:
         ctx.run_adjustment = ctx.dew_risk * 4 + 160 * (ctx.stage_run_multiplier - 1)
-
-    sim = simulate_match(ctx, iterations=5000)
+        if target:
+            # One table read per ball: no simulation on the chase path
+            return chase_match(ctx, runs, wickets, balls_remaining(overs), target), ctx, target
+
+    # Surface lookups take microseconds; simulate only what it does not cover
+    surface = win_surface()
+    if surface and surface.covers(ctx):
+        sim = surface.match(ctx)
+    else:
+        sim = simulate_match(ctx, iterations=5000, target_se=LIVE_TARGET_SE)
     return sim, ctx, runs + (ctx.venue_avg_runs + ctx.run_adjustment - runs)
 
 
@@ -175,12 +233,16 @@ def print_update(runs, wickets, overs, sim, projected_total):
     print(f"  {MATCH_CONFIG['team_batting_first']:20s} WIN: {sim.win_prob_batting_first:.1%}")
     print(f"  {MATCH_CONFIG['team_batting_second']:20s} WIN: {sim.win_prob_batting_second:.1%}")
 
-    # EV vs live odds
-    ev = detect_ev(sim, "Live", LIVE_ODDS)
-    if ev.signals:
+    # EV vs live odds: the book reprices every row, but reports only changes
+    book, events = live_book(sim)
+    signals = ev_signals(sim, book.scan())
+    if events:
+        print(f"  {'─'*56}")
+        print_events(events)
+    if signals:
         print(f"  {'─'*56}")
         print(f"  ⚡ EV SIGNALS:")
-        for sig in ev.signals:
+        for sig in signals:
             icon = "🔥" if sig.strength == "strong" else "✅"
             print(f"    {icon} {sig.selection}")
             print(f"       Edge: +{sig.edge_percent:.1f}%  EV/₹1000: {sig.ev_per_1000:+.0f}")
@@ -208,8 +270,9 @@ def print_update(runs, wickets, overs, sim, projected_total):
 def manual_input_mode():
     """Fallback: manual score entry if scraper fails."""
     print("\n  Auto-scraping failed or not available.")
-    print("  Enter score manually each over (format: runs/wickets overs)")
-    print("  Example: 54/1 6.0  or  type 'q' to quit\n")
+    print("  Enter score manually each over (format: runs/wickets overs [target])")
+    print("  Example: 54/1 6.0  or  88/3 11.2 171 in a chase  or  type 'q' to quit")
+    print("  Price move: odds team_batting_first 1.45\n")
 
     while True:
         try:
@@ -217,17 +280,25 @@ def manual_input_mode():
             if raw.lower() == 'q':
                 break
             parts = raw.split()
-            if len(parts) == 2:
+            if parts and parts[0] == "odds" and len(parts) == 3:
+                if _book is None:
+                    print("  Enter a score first.")
+                else:
+                    print_events(_book.tick("match_winner", parts[1], float(parts[2])))
+                    print(f"  {parts[1]} now {float(parts[2]):.2f}")
+            elif len(parts) in (2, 3):
                 rw = parts[0].split('/')
                 runs    = int(rw[0])
                 wickets = int(rw[1]) if len(rw) > 1 else 0
                 overs   = float(parts[1])
+                target  = int(parts[2]) if len(parts) == 3 else None
 
-                sim, ctx, projected = live_win_probability(runs, wickets, overs)
+                sim, ctx, projected = live_win_probability(runs, wickets, overs,
+                                                           2 if target else 1, target)
                 print_update(runs, wickets, overs, sim, projected)
             else:
                 print("  Format: runs/wickets overs  e.g. 54/1 6.0")
-        except (ValueError, IndexError):
+        except (ValueError, IndexError, KeyError):
             print("  Invalid format. Try: 54/1 6.0")
         except KeyboardInterrupt:
             print("\n  Stopped.")
@@ -247,12 +318,15 @@ def auto_mode():
             wickets = score["wickets"]
             overs   = score["overs"]
 
-            # Only print if score has changed
-            if runs != state.prev_runs or wickets != state.prev_wickets:
-                sim, ctx, projected = live_win_probability(runs, wickets, overs)
+            # Only print if score has changed (in a chase, every ball does)
+            if runs != state.prev_runs or wickets != state.prev_wickets or \
+                    (CHASE_TARGET and overs != state.overs):
+                sim, ctx, projected = live_win_probability(runs, wickets, overs,
+                                                           2 if CHASE_TARGET else 1, CHASE_TARGET)
                 print_update(runs, wickets, overs, sim, projected)
                 state.prev_runs    = runs
                 state.prev_wickets = wickets
+                state.overs        = overs
         else:
             print(f"  [{datetime.now().strftime('%H:%M:%S')}] Waiting for score...")
 
@@ -3,7 +3,7 @@ from pathlib import Path
 sys.path.insert(0, str(Path(__file__).parent.parent))
 
 from agents.context_engine.context import build_match_context
-from agents.simulation.monte_carlo import simulate_match
+from agents.simulation.cache import cached_simulate_match, default_cache
 from agents.market_edge.ev_detector import detect_ev, implied_to_decimal
 
 DEMO_MATCH = {
@@ -27,12 +27,9 @@ DEMO_ODDS = {
 
 def run(match_config, odds):
     ctx = build_match_context(**match_config)
-    session_lines = {}
-    sim_pre = simulate_match(context=ctx, iterations=10000)
-    for s in sim_pre.sessions:
-        session_lines[s.over] = [round(s.mean_runs, 0)]
-
-    sim = simulate_match(context=ctx, lines=session_lines, iterations=10000)
+    # One simulation prices every line: session lines are set at the model means
+    sim = cached_simulate_match(context=ctx, iterations=10000)
+    sim = sim.with_lines({s.over: [round(s.mean_runs, 0)] for s in sim.sessions})
     label = f"{match_config['team_batting_first']} vs {match_config['team_batting_second']}"
     ev    = detect_ev(sim, label, odds)
 
@@ -55,6 +52,8 @@ def run(match_config, odds):
     for sig in ev.signals:
         print(f"    [{sig.strength.upper():8s}] {sig.selection}")
         print(f"               Model: {sig.model_prob:.1%} | Implied: {sig.implied_prob:.1%} | Edge: +{sig.edge_percent:.1f}% | EV/1000: {sig.ev_per_1000:+.0f}")
+    cache = default_cache().stats()
+    print(f"  Sim cache: {cache['memory_hits'] + cache['disk_hits']} hits, {cache['misses']} misses")
     print("=" * 60)
 
 if __name__ == "__main__":
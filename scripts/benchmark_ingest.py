@@ -0,0 +1,107 @@
+#!/usr/bin/env python3
+"""
+Benchmarks Cricsheet ingest.
+
+  io      — raw read of every match: extracted directory vs zip members
+  workers — load_all_matches at 1..N parser workers, for each source
+  memory  — peak RSS of a fresh process running load_all_matches, and the
+            deep size of the resulting balls_df
+
+Usage: python scripts/benchmark_ingest.py [io|workers|memory|all] [--max-workers N] [--repeat R]
+"""
+import sys, os, time, argparse, contextlib, io, zipfile, subprocess
+from pathlib import Path
+sys.path.insert(0, str(Path(__file__).parent.parent))
+
+from agents.data_scout.parser import load_all_matches
+from config.settings import CRICSHEET_ZIP, DATA_RAW
+
+JSON_DIR = DATA_RAW / "ipl_json"
+
+def _best_of(repeat, fn):
+    best, out = float("inf"), None
+    for _ in range(repeat):
+        start = time.perf_counter()
+        out   = fn()
+        best  = min(best, time.perf_counter() - start)
+    return best, out
+
+def _read_dir():
+    total = 0
+    for path in sorted(JSON_DIR.glob("*.json")):
+        with open(path, "rb") as f:
+            total += len(f.read())
+    return total
+
+def _read_zip():
+    total = 0
+    with zipfile.ZipFile(CRICSHEET_ZIP) as zf:
+        for name in sorted(n for n in zf.namelist() if n.endswith(".json")):
+            with zf.open(name) as f:
+                total += len(f.read())
+    return total
+
+def _sources():
+    return [(label, path) for label, path in (("dir", JSON_DIR), ("zip", CRICSHEET_ZIP))
+            if path.exists()]
+
+def bench_io(repeat):
+    n_files = len(list(JSON_DIR.glob("*.json")))
+    print(f"Raw read | {n_files} extracted files vs {CRICSHEET_ZIP.name} | best of {repeat}")
+    print(f"  {'Source':>6} {'Seconds':>8} {'MB/s':>8} {'On disk':>9}")
+    for label, fn, footprint in (
+        ("dir", _read_dir, sum(p.stat().st_size for p in JSON_DIR.glob("*.json"))),
+        ("zip", _read_zip, CRICSHEET_ZIP.stat().st_size),
+    ):
+        seconds, n_bytes = _best_of(repeat, fn)
+        print(f"  {label:>6} {seconds:>8.3f} {n_bytes / 1e6 / seconds:>8.0f} {footprint / 1e6:>7.1f}MB")
+
+def bench_workers(max_workers, repeat):
+    print(f"\nload_all_matches | {os.cpu_count()} CPUs visible | best of {repeat}")
+    print(f"  {'Source':>6} {'Workers':>7} {'Seconds':>8} {'Matches/s':>10} {'Balls/s':>9} {'Speedup':>8}")
+    for label, path in _sources():
+        baseline = None
+        for workers in range(1, max_workers + 1):
+            def run():
+                with contextlib.redirect_stdout(io.StringIO()):
+                    return load_all_matches(path, workers=workers)
+            seconds, (matches_df, balls_df) = _best_of(repeat, run)
+            baseline = baseline or seconds
+            print(f"  {label:>6} {workers:>7} {seconds:>8.2f} "
+                  f"{len(matches_df) / seconds:>10.0f} {len(balls_df) / seconds:>9.0f} "
+                  f"{baseline / seconds:>7.2f}x")
+    print(f"  ({len(matches_df)} matches, {len(balls_df):,} deliveries)")
+
+_MEMORY_PROBE = """
+import sys, resource, contextlib, io
+sys.path.insert(0, {root!r})
+from pathlib import Path
+from agents.data_scout.parser import load_all_matches
+with contextlib.redirect_stdout(io.StringIO()):
+    matches_df, balls_df = load_all_matches(Path({source!r}))
+peak = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+print(peak * (1 if sys.platform == "darwin" else 1024), balls_df.memory_usage(deep=True).sum())
+"""
+
+def bench_memory():
+    print("\nload_all_matches memory | fresh interpreter per source")
+    print(f"  {'Source':>6} {'Peak RSS':>10} {'balls_df':>10}")
+    root = str(Path(__file__).parent.parent)
+    for label, path in _sources():
+        probe = _MEMORY_PROBE.format(root=root, source=str(path))
+        out   = subprocess.run([sys.executable, "-c", probe], capture_output=True, text=True, check=True)
+        peak, deep = map(int, out.stdout.split()[-2:])
+        print(f"  {label:>6} {peak / 2**20:>8.0f}MB {deep / 2**20:>8.1f}MB")
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser()
+    parser.add_argument("mode", nargs="?", choices=["io", "workers", "memory", "all"], default="all")
+    parser.add_argument("--max-workers", type=int, default=os.cpu_count() or 1)
+    parser.add_argument("--repeat", type=int, default=1)
+    args = parser.parse_args()
+    if args.mode in ("io", "all"):
+        bench_io(args.repeat)
+    if args.mode in ("workers", "all"):
+        bench_workers(args.max_workers, args.repeat)
+    if args.mode in ("memory", "all"):
+        bench_memory()
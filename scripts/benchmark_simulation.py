@@ -0,0 +1,126 @@
+#!/usr/bin/env python3
+"""
+Benchmarks the variance-reduction modes of the match simulator.
+
+  sampling — replicates simulate_match under each sampling mode with fresh
+             seeds and reports the spread of win_prob_batting_first and of
+             session-line probabilities. The effective-iterations gain is
+             var(mc) / var(mode): how many independent iterations one
+             iteration of the mode is worth.
+  crn      — replicates the toss bat-vs-field and with-vs-without-absent-player
+             differences with independent draws and with common random
+             numbers, and reports the same gain on the difference.
+  parallel — one large match with a fixed shard count on 1..N worker
+             processes, and a ten-match slate; reports speedup vs one worker
+             and checks every run matches the single-worker result.
+
+Usage: python scripts/benchmark_simulation.py [sampling|crn|parallel|all]
+           [--iterations N] [--replications R] [--max-workers W] [--shards S]
+"""
+import sys, os, time, argparse
+from dataclasses import replace
+from pathlib import Path
+sys.path.insert(0, str(Path(__file__).parent.parent))
+
+import numpy as np
+from agents.context_engine.context import build_match_context, PlayerAbsence
+from agents.simulation.monte_carlo import (
+    SAMPLING_MODES, simulate_match, simulate_matches, simulate_scenarios,
+)
+
+MATCH = dict(venue="Wankhede Stadium", team_batting_first="Mumbai Indians",
+             team_batting_second="Chennai Super Kings", toss_winner="Chennai Super Kings",
+             toss_decision="field", match_time="night", tournament_stage="league_mid")
+LINES = {6: [44.5], 20: [160.5]}
+
+def _estimates(result):
+    """The probabilities being estimated: win prob, then each session line."""
+    values = {"win_prob_batting_first": result.win_prob_batting_first}
+    for session in result.sessions:
+        for line, prob in session.prob_over_line.items():
+            values[f"over {session.over} > {line}"] = prob
+    return values
+
+def _variances(runs):
+    keys = runs[0].keys()
+    return {k: np.var([r[k] for r in runs], ddof=1) for k in keys}
+
+def bench_sampling(iterations, replications):
+    ctx = build_match_context(**MATCH)
+    print(f"Sampling modes | {iterations} iterations x {replications} replications")
+    variances, timings = {}, {}
+    for mode in SAMPLING_MODES:
+        start = time.perf_counter()
+        runs  = [_estimates(simulate_match(ctx, lines=LINES, iterations=iterations, seed=seed,
+                                           sampling=mode))
+                 for seed in range(replications)]
+        timings[mode]   = (time.perf_counter() - start) / replications
+        variances[mode] = _variances(runs)
+    print(f"  {'Estimate':<24} " + " ".join(f"{m:>11}" for m in SAMPLING_MODES))
+    for key, base in variances["mc"].items():
+        gains = [base / variances[m][key] if variances[m][key] else float("inf") for m in SAMPLING_MODES]
+        print(f"  {key:<24} " + " ".join(f"{g:>10.2f}x" for g in gains))
+    print(f"  {'ms per run':<24} " + " ".join(f"{timings[m] * 1000:>11.0f}" for m in SAMPLING_MODES))
+
+def bench_crn(iterations, replications):
+    base = build_match_context(**MATCH)
+    pairs = {
+        "toss field - bat": (base, build_match_context(**{**MATCH, "toss_decision": "bat",
+                                                          "toss_winner": MATCH["team_batting_first"]})),
+        "absent star batter": (base, build_match_context(**MATCH, absent_players=[
+            PlayerAbsence("Rohit Sharma", "batter", "Mumbai Indians")])),
+        "chase advantage +0.02": (base, replace(base, venue_chase_advantage=base.venue_chase_advantage + 0.02)),
+    }
+    print(f"\nCommon random numbers | {iterations} iterations x {replications} replications")
+    print(f"  {'Scenario pair':<24} {'Mean diff':>10} {'SD indep':>9} {'SD CRN':>8} {'Gain':>8}")
+    for label, (a, b) in pairs.items():
+        spread = {}
+        for crn in (False, True):
+            diffs = []
+            for seed in range(replications):
+                ra, rb = simulate_scenarios([a, b], lines=LINES, iterations=iterations,
+                                            seed=seed * 2, common_random_numbers=crn)
+                diffs.append(ra.win_prob_batting_first - rb.win_prob_batting_first)
+            spread[crn] = (np.mean(diffs), np.std(diffs, ddof=1))
+        gain = (spread[False][1] / spread[True][1]) ** 2 if spread[True][1] else float("inf")
+        print(f"  {label:<24} {spread[True][0]:>+10.4f} {spread[False][1]:>9.4f} "
+              f"{spread[True][1]:>8.4f} {gain:>7.1f}x")
+
+def bench_parallel(iterations, max_workers, shards):
+    ctx   = build_match_context(**MATCH)
+    slate = [build_match_context(**{**MATCH, "venue": venue}) for venue in (
+        "Wankhede Stadium", "Eden Gardens", "M Chinnaswamy Stadium", "Feroz Shah Kotla",
+        "Sawai Mansingh Stadium", "MA Chidambaram Stadium, Chepauk", "Sharjah Cricket Stadium",
+        "Dubai International Cricket Stadium", "Sheikh Zayed Stadium", "Brabourne Stadium, Mumbai")]
+    print(f"\nSharded simulation | {os.cpu_count()} CPUs visible | {shards} shards")
+    print(f"  {'Job':<22} {'Workers':>7} {'Seconds':>8} {'Speedup':>8} {'Identical':>10}")
+    jobs = {
+        f"1 match x {iterations:,}": lambda w: [simulate_match(ctx, LINES, iterations=iterations,
+                                                                 shards=shards, workers=w)],
+        f"10 matches x {iterations // 10:,}": lambda w: simulate_matches(
+            slate, LINES, iterations=iterations // 10, shards=shards, workers=w),
+    }
+    for label, run in jobs.items():
+        baseline = reference = None
+        for workers in range(1, max_workers + 1):
+            start   = time.perf_counter()
+            results = run(workers)
+            seconds = time.perf_counter() - start
+            baseline, reference = baseline or seconds, reference or results
+            print(f"  {label:<22} {workers:>7} {seconds:>8.2f} {baseline / seconds:>7.2f}x "
+                  f"{str(results == reference):>10}")
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser()
+    parser.add_argument("mode", nargs="?", choices=["sampling", "crn", "parallel", "all"], default="all")
+    parser.add_argument("--iterations", type=int, default=2048)
+    parser.add_argument("--replications", type=int, default=40)
+    parser.add_argument("--max-workers", type=int, default=os.cpu_count() or 1)
+    parser.add_argument("--shards", type=int, default=8)
+    args = parser.parse_args()
+    if args.mode in ("sampling", "all"):
+        bench_sampling(args.iterations, args.replications)
+    if args.mode in ("crn", "all"):
+        bench_crn(args.iterations, args.replications)
+    if args.mode in ("parallel", "all"):
+        bench_parallel(max(args.iterations, 200_000), args.max_workers, args.shards)
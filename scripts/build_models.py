@@ -3,73 +3,121 @@
 Reads Cricsheet data and builds venue/toss/session models.
 Run after download_cricsheet.py.
 
-Usage: python scripts/build_models.py
+Models are kept as running statistics in data/models/model_state.json and
+updated with new matches only; data/models/generated_settings.json carries
+the venue numbers the context engine uses in place of config.settings.
+
+Usage: python scripts/build_models.py [--source PATH] [--workers N] [--no-cache] [--csv]
+
+--source defaults to data/raw/ipl_json, or data/raw/ipl_all.zip when the
+archive was downloaded without extracting it.
 """
-import sys
+import sys, argparse, csv
+from datetime import datetime
 from pathlib import Path
 sys.path.insert(0, str(Path(__file__).parent.parent))
 
-import pandas as pd
 from agents.data_scout.parser import load_all_matches
-from config.settings import DATA_RAW, DATA_PROCESSED
+from agents.data_scout.store import write_ball_arrays, write_store
+from agents.data_scout.models import ModelState, write_generated_settings
+from agents.player_intelligence.aggregates import PlayerIndex
+from config.settings import (
+    BALL_ARRAYS_DIR, CRICSHEET_ZIP, DATA_RAW, DATA_PROCESSED, DATA_STORE, GENERATED_SETTINGS_PATH,
+    MODEL_STATE_PATH, PARSE_CACHE_DIR, PLAYER_INDEX_PATH, ROOT_DIR, SESSION_OVERS,
+)
+
+def default_source():
+    json_dir = DATA_RAW / "ipl_json"
+    if json_dir.exists() and any(json_dir.glob("*.json")):
+        return json_dir
+    return CRICSHEET_ZIP if CRICSHEET_ZIP.exists() else json_dir
 
-def main():
+INGEST_LOG = DATA_PROCESSED / "ingest_log.csv"
+
+def log_parse_stats(stats, total_deliveries):
+    """Appends this run's parse throughput so it can be tracked as the corpus grows."""
+    fields = ["timestamp", "files_parsed", "deliveries_parsed", "seconds",
+              "deliveries_per_sec", "total_deliveries"]
+    new = not INGEST_LOG.exists()
+    with open(INGEST_LOG, "a", newline="") as f:
+        writer = csv.DictWriter(f, fieldnames=fields)
+        if new:
+            writer.writeheader()
+        writer.writerow({
+            "timestamp":          datetime.now().isoformat(timespec="seconds"),
+            "files_parsed":       stats["files"],
+            "deliveries_parsed":  stats["deliveries"],
+            "seconds":            round(stats["seconds"], 3),
+            "deliveries_per_sec": round(stats["deliveries_per_sec"]),
+            "total_deliveries":   total_deliveries,
+        })
+
+def main(source=None, workers=1, use_cache=True, write_csv=False):
     print("=" * 60)
     print("Matchpredictor — Model Builder")
     print("=" * 60)
     DATA_PROCESSED.mkdir(parents=True, exist_ok=True)
-    json_dir = DATA_RAW / "ipl_json"
-    matches_df, balls_df = load_all_matches(json_dir)
+    matches_df, balls_df = load_all_matches(
+        source or default_source(), workers=workers, cache_dir=PARSE_CACHE_DIR if use_cache else None,
+    )
+
+    if balls_df.attrs["parse_stats"]["files"]:
+        log_parse_stats(balls_df.attrs["parse_stats"], len(balls_df))
 
     matches_df.to_csv(DATA_PROCESSED / "matches.csv", index=False)
-    balls_df.to_csv(DATA_PROCESSED / "balls.csv", index=False)
+    write_store(matches_df, balls_df, DATA_STORE)
+    write_ball_arrays(balls_df, BALL_ARRAYS_DIR)
+    if write_csv:
+        balls_df.to_csv(DATA_PROCESSED / "balls.csv", index=False)
     print(f"Saved {len(matches_df)} matches and {len(balls_df):,} balls to data/processed/")
 
-    # Venue run model
-    innings1 = balls_df[balls_df["innings"] == 1].copy()
-    venue_runs = (
-        innings1.groupby(["match_id", "venue"])["runs_total"].sum()
-        .reset_index().rename(columns={"runs_total": "innings1_total"})
-    )
-    venue_model = (
-        venue_runs.groupby("venue")["innings1_total"]
-        .agg(avg_runs="mean", std_runs="std", match_count="count")
-        .reset_index().sort_values("match_count", ascending=False)
-    )
+    # Player/venue aggregates: only matches not yet indexed are folded in.
+    # A full parse (--no-cache) rebuilds from scratch in case history changed.
+    index = PlayerIndex.load(PLAYER_INDEX_PATH) if use_cache else PlayerIndex()
+    added = index.update(balls_df)
+    index.save(PLAYER_INDEX_PATH)
+    print(f"Player index: {added} new matches, {len(index.batters)} batters, "
+          f"{len(index.bowlers)} bowlers, {len(index.venues)} venues.")
+
+    # Venue, session and toss models are running statistics: only matches the
+    # saved state has not seen are folded in, like the player index.
+    state = ModelState.load(MODEL_STATE_PATH) if use_cache else ModelState()
+    added = state.update(matches_df, balls_df)
+    state.save(MODEL_STATE_PATH)
+    write_generated_settings(state, GENERATED_SETTINGS_PATH)
+    print(f"\nModel state: {added} new matches, {len(state.match_ids)} total.")
+
+    venue_model = state.venue_model()
     venue_model.to_csv(DATA_PROCESSED / "venue_model.csv", index=False)
     print("\nVenue model (top 8):")
     print(venue_model.head(8).to_string(index=False))
 
-    # Session checkpoint model
-    rows = []
-    for match_id, group in balls_df[balls_df["innings"] == 1].groupby("match_id"):
-        venue = group["venue"].iloc[0]
-        for cp in [6, 10, 15, 20]:
-            runs_at = group[group["over"] <= cp]["runs_total"].sum()
-            rows.append({"match_id": match_id, "venue": venue, "over": cp, "runs": runs_at})
-    sessions_df = pd.DataFrame(rows)
-    session_model = (
-        sessions_df.groupby(["venue", "over"])["runs"]
-        .agg(mean_runs="mean", std_runs="std").reset_index()
-    )
+    # Session checkpoint model: every over of both innings.
+    # session_model.csv keeps the innings-1 SESSION_OVERS slice.
+    all_overs = state.session_model()
+    all_overs.to_csv(DATA_PROCESSED / "session_model_all_overs.csv", index=False)
+    session_model = all_overs[
+        (all_overs["innings"] == 1) & all_overs["over"].isin(SESSION_OVERS)
+    ][["venue", "over", "mean_runs", "std_runs"]]
     session_model.to_csv(DATA_PROCESSED / "session_model.csv", index=False)
     print("\nSession model saved.")
 
-    # Toss advantage model
-    toss_df = matches_df[
-        matches_df["toss_decision"].isin(["bat", "field"]) &
-        matches_df["winner"].notna() & (matches_df["winner"] != "")
-    ].copy()
-    toss_df["toss_winner_won"] = toss_df["toss_winner"] == toss_df["winner"]
-    toss_model = (
-        toss_df.groupby(["venue", "toss_decision"])["toss_winner_won"]
-        .agg(win_rate="mean", match_count="count").reset_index()
-        .sort_values("win_rate", ascending=False)
-    )
+    toss_model = state.toss_model()
     toss_model.to_csv(DATA_PROCESSED / "toss_model.csv", index=False)
     print("\nToss model (top 8):")
     print(toss_model.head(8).to_string(index=False))
+    print(f"Generated settings written to {GENERATED_SETTINGS_PATH.relative_to(ROOT_DIR)}")
     print("\nDone. Run: python dashboard/live_dashboard.py")
 
 if __name__ == "__main__":
-    main()
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--source", type=Path, default=None,
+                        help="directory of Cricsheet JSON files or a Cricsheet .zip")
+    parser.add_argument("--workers", type=int, default=1,
+                        help="parse match files across N processes (default: serial)")
+    parser.add_argument("--no-cache", action="store_true",
+                        help="re-parse every match file instead of only new/changed ones")
+    parser.add_argument("--csv", action="store_true",
+                        help="also export deliveries to data/processed/balls.csv")
+    args = parser.parse_args()
+    main(source=args.source, workers=args.workers, use_cache=not args.no_cache, write_csv=args.csv)
@@ -0,0 +1,52 @@
+#!/usr/bin/env python3
+"""
+Builds the per-venue win-probability surface used for in-play pricing
+(agents/simulation/surface.py) from the current venue registry, so run it
+after build_models.py.
+
+Prints the build time, file size, worst interpolation error against the
+exact engine, lookup cost, and a spot check of surface vs simulate_match
+for CHECK_VENUES.
+
+Usage: python scripts/build_surface.py [--out PATH] [--check-iterations N]
+"""
+import sys, time, argparse
+from pathlib import Path
+sys.path.insert(0, str(Path(__file__).parent.parent))
+
+from agents.context_engine.context import build_match_context, venue_registry
+from agents.simulation.monte_carlo import simulate_match
+from agents.simulation.surface import WinSurface, build_surface
+from config.settings import WIN_SURFACE_PATH
+
+CHECK_VENUES = ["Wankhede Stadium", "Eden Gardens", "M Chinnaswamy Stadium", "Sharjah Cricket Stadium"]
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--out", type=Path, default=WIN_SURFACE_PATH)
+    parser.add_argument("--check-iterations", type=int, default=20000)
+    args = parser.parse_args()
+
+    venues, _ = venue_registry()
+    start     = time.perf_counter()
+    surface   = build_surface({name: float(data.get("avg_powerplay_runs", 50.0))
+                               for name, data in venues.items()})
+    surface.save(args.out)
+    print(f"Built {surface} in {time.perf_counter() - start:.1f}s")
+    print(f"  {args.out} ({args.out.stat().st_size / 1024:.0f} KB)")
+
+    surface = WinSurface.load(args.out)
+    start   = time.perf_counter()
+    for _ in range(10_000):
+        surface.win_prob_first(surface.venues[0], 163.3, 171.2)
+    print(f"  Lookup: {(time.perf_counter() - start) / 10_000 * 1e6:.1f} us")
+
+    print(f"\n  {'Venue':<26} {'Surface':>8} {'Simulated':>10} {'Diff':>7}")
+    for venue in CHECK_VENUES:
+        if venue not in surface.index:
+            continue
+        ctx = build_match_context(venue, "Team A", "Team B", "Team B", "field", "night", "league_mid")
+        fast, full = surface.match(ctx), simulate_match(ctx, iterations=args.check_iterations)
+        diff = fast.win_prob_batting_first - full.win_prob_batting_first
+        print(f"  {venue:<26} {fast.win_prob_batting_first:>8.3f} "
+              f"{full.win_prob_batting_first:>10.3f} {diff:>+7.3f}")
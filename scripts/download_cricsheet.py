@@ -3,17 +3,23 @@
 Downloads all IPL ball-by-ball data from Cricsheet.org — free, ~50MB.
 Run once before build_models.py.
 
-Usage: python scripts/download_cricsheet.py
+Usage: python scripts/download_cricsheet.py [--no-extract]
+
+With --no-extract only the zip is kept; build_models.py parses it in place.
 """
-import sys, zipfile
+import sys, zipfile, argparse
 from pathlib import Path
 sys.path.insert(0, str(Path(__file__).parent.parent))
 
 import requests
 from config.settings import CRICSHEET_URL, CRICSHEET_ZIP, DATA_RAW
 
-def main():
+def main(extract=True):
     json_dir = DATA_RAW / "ipl_json"
+    if not extract and CRICSHEET_ZIP.exists():
+        print(f"Already have {CRICSHEET_ZIP}")
+        print("Delete it to force re-download.")
+        return
     if json_dir.exists() and any(json_dir.glob("*.json")):
         count = len(list(json_dir.glob("*.json")))
         print(f"Already have {count} match files in {json_dir}")
@@ -34,6 +40,9 @@ def main():
                 pct = downloaded / total * 100
                 print(f"\r  {pct:.1f}% ({downloaded//1024//1024}MB)", end="", flush=True)
     print(f"\nSaved to {CRICSHEET_ZIP}")
+    if not extract:
+        print("\nNext step: python scripts/build_models.py")
+        return
 
     print("Extracting...")
     json_dir.mkdir(parents=True, exist_ok=True)
@@ -45,4 +54,8 @@ def main():
     print("\nNext step: python scripts/build_models.py")
 
 if __name__ == "__main__":
-    main()
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--no-extract", action="store_true",
+                        help="keep only the zip; build_models.py reads it directly")
+    args = parser.parse_args()
+    main(extract=not args.no_extract)
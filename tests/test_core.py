@@ -1,11 +1,21 @@
 import sys
 from pathlib import Path
 sys.path.insert(0, str(Path(__file__).parent.parent))
+import json, shutil, zipfile
+import numpy as np
+import pandas as pd
 import pytest
+from agents.data_scout.parser import load_all_matches
 from agents.context_engine.context import build_match_context, PlayerAbsence
 from agents.simulation.monte_carlo import simulate_match
 from agents.market_edge.ev_detector import detect_ev, decimal_to_implied, implied_to_decimal
 
+@pytest.fixture(autouse=True)
+def config_registry(tmp_path, monkeypatch):
+    """Venue data from config/settings.py only, whatever build_models.py has generated locally."""
+    monkeypatch.setattr("agents.context_engine.context.GENERATED_SETTINGS_PATH",
+                        tmp_path / "missing_generated_settings.json")
+
 @pytest.fixture
 def ctx():
     return build_match_context(
@@ -70,8 +80,469 @@ def test_strong_ev_on_mispriced_odds(sim):
     })
     assert any(s.strength == "strong" for s in report.signals)
 
+def test_session_signal_selections(ctx):
+    sim    = simulate_match(ctx, iterations=1000, lines={6: [50], 20: [160.5]})
+    odds   = {"session_runs": {6: {"over": 10.0, "under": 10.0}, 20: {"over": 10.0, "under": 10.0}}}
+    report = detect_ev(sim, "MI vs CSK", odds)
+    assert [s.selection for s in report.signals] == [
+        "Runs Over 50 at 6 overs", "Runs Under 50 at 6 overs",
+        "Runs Over 160.5 at 20 overs", "Runs Under 160.5 at 20 overs",
+    ]
+
 def test_decimal_to_implied():
     assert abs(decimal_to_implied(2.0) - 0.50) < 0.001
 
 def test_implied_to_decimal():
     assert abs(implied_to_decimal(0.5) - 2.0) < 0.001
+
+@pytest.fixture
+def json_dir(tmp_path):
+    src = Path(__file__).parent.parent / "data" / "raw" / "ipl_json"
+    for f in sorted(src.glob("*.json"))[:6]:
+        shutil.copy(f, tmp_path / f.name)
+    (tmp_path / "0000000.json").write_text("{not json")
+    return tmp_path
+
+def test_parallel_parse_matches_serial(json_dir, capsys):
+    m1, b1 = load_all_matches(json_dir, workers=1, chunk_size=2)
+    serial_out = capsys.readouterr().out
+    m2, b2 = load_all_matches(json_dir, workers=2, chunk_size=2)
+    assert "Skipping 0000000.json" in serial_out
+    assert "Skipping 0000000.json" in capsys.readouterr().out
+    assert len(m1) == 6
+    assert m1.equals(m2) and b1.equals(b2)
+
+def test_incremental_cache_reparses_only_changed(json_dir, tmp_path_factory, capsys):
+    cache = tmp_path_factory.mktemp("cache")
+    full_m, full_b = load_all_matches(json_dir)
+    load_all_matches(json_dir, cache_dir=cache)
+    capsys.readouterr()
+    first = sorted(json_dir.glob("1*.json"))[0]
+    first.write_text(first.read_text())   # same bytes, new mtime; the broken file is always retried
+    m, b = load_all_matches(json_dir, cache_dir=cache)
+    assert "Parsing 1 new/changed of 7" in capsys.readouterr().out
+    assert m.equals(full_m) and b.equals(full_b)
+    shutil.copy(first, json_dir / "9999999.json")
+    m, b = load_all_matches(json_dir, cache_dir=cache)
+    assert "Parsing 2 new/changed of 8" in capsys.readouterr().out
+    assert list(m["match_id"])[-1] == "9999999" and len(m) == 7
+
+def test_ball_store_projection_and_filters(json_dir, tmp_path_factory):
+    pytest.importorskip("pyarrow")
+    from agents.data_scout.store import write_store, load_balls
+    store = tmp_path_factory.mktemp("store")
+    matches, balls = load_all_matches(json_dir)
+    write_store(matches, balls, store)
+    assert len(load_balls(store_dir=store)) == len(balls)
+    batter = balls["batter"].iloc[0]
+    venue  = balls["venue"].iloc[0]
+    sub = load_balls(columns=["batter", "runs_batter"], venues=[venue], batters=[batter],
+                     seasons=[balls["season"].iloc[0]], store_dir=store)
+    expected = balls[(balls["batter"] == batter) & (balls["venue"] == venue)]
+    assert list(sub.columns) == ["batter", "runs_batter"]
+    assert sub["runs_batter"].sum() == expected["runs_batter"].sum()
+    assert str(sub["runs_batter"].dtype) == "int8"
+
+def test_zip_source_matches_directory(json_dir, tmp_path_factory):
+    archive = tmp_path_factory.mktemp("zip") / "ipl_all.zip"
+    with zipfile.ZipFile(archive, "w", zipfile.ZIP_DEFLATED) as zf:
+        zf.writestr("README.txt", "not a match")
+        for f in sorted(json_dir.glob("*.json")):
+            zf.write(f, f.name)
+    m1, b1 = load_all_matches(json_dir)
+    m2, b2 = load_all_matches(archive, workers=2, chunk_size=2)
+    assert m1.equals(m2) and b1.equals(b2)
+
+def test_balls_df_is_compact(json_dir):
+    _, balls = load_all_matches(json_dir)
+    assert str(balls["runs_total"].dtype) == "int8"
+    assert isinstance(balls["batter"].dtype, pd.CategoricalDtype)
+    assert list(balls["batter"].cat.categories) == list(balls["bowler"].cat.categories)
+    assert balls["batter"].cat.categories.is_monotonic_increasing
+
+def test_failed_file_leaves_no_partial_deliveries(json_dir):
+    clean_m, clean_b = load_all_matches(json_dir)
+    raw = json.loads(sorted(json_dir.glob("1*.json"))[0].read_text())
+    raw["innings"][0]["overs"][3]["deliveries"][0]["runs"]["total"] = 1000
+    raw["innings"][0]["overs"][3]["deliveries"][0]["batter"] = "Nobody"
+    (json_dir / "5555555.json").write_text(json.dumps(raw))
+    m, b = load_all_matches(json_dir)
+    assert m.equals(clean_m) and b.equals(clean_b)
+    assert "Nobody" not in b["batter"].cat.categories
+    assert b.attrs["parse_stats"]["deliveries"] == len(b)
+
+def test_over_progression_matches_loop(json_dir):
+    from agents.data_scout.models import over_progression
+    _, balls = load_all_matches(json_dir)
+    prog = over_progression(balls)
+    assert len(prog) == balls.groupby(["match_id", "innings"]).ngroups * 20
+    for (match_id, innings), group in balls[balls["innings"] <= 2].groupby(["match_id", "innings"]):
+        cum = prog[(prog["match_id"] == match_id) & (prog["innings"] == innings)]
+        for cp in (1, 6, 13, 20):
+            row = cum[cum["over"] == cp].iloc[0]
+            assert row["runs"] == group[group["over"] <= cp]["runs_total"].sum()
+            assert row["wickets"] == group[group["over"] <= cp]["is_wicket"].sum()
+
+def test_player_index_incremental_matches_full_build(json_dir, tmp_path_factory):
+    from agents.player_intelligence.aggregates import PlayerIndex, form_index
+    _, balls = load_all_matches(json_dir)
+    full = PlayerIndex.build(balls)
+    ids  = sorted(balls["match_id"].unique())
+    path = tmp_path_factory.mktemp("index") / "player_index.json"
+    PlayerIndex.build(balls[balls["match_id"].isin(ids[:3])]).save(path)
+    partial = PlayerIndex.load(path)
+    assert partial.update(balls) == len(ids) - 3
+    assert partial.update(balls) == 0
+    assert partial.batters == full.batters and partial.batter_venues == full.batter_venues
+    assert partial.bowlers == full.bowlers and partial.venues == full.venues
+
+    batter = balls["batter"].iloc[0]
+    faced  = balls[balls["batter"] == batter]
+    stats  = full.batter(batter)
+    assert stats["runs"] == faced["runs_batter"].sum() and stats["balls"] == len(faced)
+    assert stats["form"] == form_index(stats["recent"])
+    bowler = max(full.bowlers, key=lambda name: full.bowlers[name]["dismissals"])
+    spell  = full.bowler(bowler)
+    assert spell["strike_rate"] == round(spell["balls"] / spell["dismissals"], 1)
+
+def test_ball_arrays_slice_one_match_zero_copy(json_dir, tmp_path_factory):
+    from agents.data_scout.store import write_ball_arrays, BallArrays
+    _, balls = load_all_matches(json_dir)
+    path = tmp_path_factory.mktemp("arrays")
+    write_ball_arrays(balls, path)
+    arrays   = BallArrays(path)
+    match_id = balls["match_id"].iloc[-1]
+    view     = arrays.match(match_id)
+    expected = balls[balls["match_id"] == match_id]
+    assert len(arrays) == len(balls) and match_id in arrays
+    assert np.shares_memory(view["runs_total"], arrays.columns["runs_total"])
+    assert (view["runs_total"] == expected["runs_total"].to_numpy()).all()
+    assert arrays.decode("batter", view["batter"][:3]) == list(expected["batter"].astype(str)[:3])
+
+def test_model_state_streaming_matches_batch(json_dir, tmp_path_factory):
+    from agents.data_scout.models import ModelState, over_progression, session_table
+    matches, balls = load_all_matches(json_dir)
+    ids   = sorted(matches["match_id"])
+    full  = ModelState()
+    assert full.update(matches, balls) == len(ids)
+    batch = session_table(over_progression(balls))
+    streamed = full.session_model()
+    assert len(streamed) == len(batch)
+    for column in ("mean_runs", "std_runs", "mean_wickets", "std_wickets"):
+        assert np.allclose(streamed[column], batch[column], equal_nan=True)
+
+    # Saved partial state + the rest, and two merged halves, equal the full build
+    path  = tmp_path_factory.mktemp("state") / "model_state.json"
+    first = matches["match_id"].isin(ids[:3])
+    head  = ModelState()
+    head.update(matches[first], balls)
+    head.save(path)
+    resumed = ModelState.load(path)
+    assert resumed.update(matches, balls) == len(ids) - 3
+    tail = ModelState()
+    tail.update(matches[~first], balls)
+    merged = ModelState.load(path).merge(tail)
+    for state in (resumed, merged):
+        assert state.toss == full.toss and state.chase == full.chase
+        pd.testing.assert_frame_equal(state.venue_model(), full.venue_model())
+        pd.testing.assert_frame_equal(state.session_model(), full.session_model())
+
+def test_generated_settings_override_registry(tmp_path):
+    from agents.context_engine.context import venue_registry
+    path = tmp_path / "generated_settings.json"
+    path.write_text(json.dumps({
+        "venues": {"Wankhede Stadium": {"avg_first_innings_t20": 181.0}},
+        "toss_field_win_boost": {"Wankhede Stadium": 0.2},
+    }))
+    venues, toss_boost = venue_registry(path)
+    assert venues["Wankhede Stadium"]["avg_first_innings_t20"] == 181.0
+    assert venues["Wankhede Stadium"]["dew_risk"] == 0.85
+    assert toss_boost["Wankhede Stadium"] == 0.2 and "default" in toss_boost
+
+def test_simulate_matches_equals_single_path(ctx):
+    from dataclasses import asdict
+    from agents.simulation.monte_carlo import simulate_matches
+    other = build_match_context("Eden Gardens","KKR","RCB","KKR","bat","night","league_mid")
+    lines = {6: [50.5], 20: [165.5]}
+    batch = simulate_matches([ctx, other, ctx], lines=lines, iterations=500, seeds=[1, 2, 3],
+                             max_cells=500 * 120 * 2)
+    for result, context, seed in zip(batch, (ctx, other, ctx), (1, 2, 3)):
+        assert result == simulate_match(context, lines=lines, iterations=500, seed=seed)
+    frame = pd.DataFrame([asdict(ctx), asdict(other)])
+    assert simulate_matches(frame, iterations=500) == simulate_matches([ctx, other], iterations=500)
+
+def test_wickets_suppress_runs_and_end_innings(sim):
+    from agents.simulation.monte_carlo import _simulate_innings
+    rng   = np.random.default_rng(0)
+    runs, wickets = _simulate_innings(rng.random((1, 2000, 120)), np.full((1, 120), 1.3),
+                                      np.full((1, 120), 0.08))
+    all_out = wickets[0, :, -1] == 10
+    assert all_out.any() and wickets.max() == 10
+    for path in np.flatnonzero(all_out)[:20]:
+        tenth = np.argmax(wickets[0, path] == 10)
+        assert (runs[0, path, tenth:] == runs[0, path, tenth]).all()
+    assert np.corrcoef(runs[0, :, -1], wickets[0, :, -1])[0, 1] < 0
+    assert abs(runs[0, :, -1].mean() - 1.3 * 120) < 5
+
+    last = sim.sessions[-1]
+    assert abs(sum(last.wickets_pmf) - 1) < 1e-9 and len(last.wickets_pmf) == 11
+    assert [s.mean_wickets for s in sim.sessions] == sorted(s.mean_wickets for s in sim.sessions)
+
+def test_checkpoint_simulation_fills_every_over():
+    from dashboard.checkpoint_predictor import simulate_from_here
+    rng     = np.random.default_rng(0)
+    results = simulate_from_here(54, 1, 6.0, rng, iterations=2000)
+    assert results.shape == (2000, 20)
+    assert np.isnan(results[:, :5]).all() and (results[:, 5] == 54).all()
+    assert (np.diff(results[:, 5:], axis=1) >= 0).all()
+    assert 140 < results[:, -1].mean() < 190
+
+    partial = simulate_from_here(60, 2, 7.3, rng, iterations=2000)
+    assert np.isnan(partial[:, :7]).all() and (partial[:, 7] >= 60).all()
+    all_out = simulate_from_here(100, 10, 15.0, rng, iterations=100)
+    assert (all_out[:, 14:] == 100).all()
+
+def test_simulation_cache_tiers_and_invalidation(ctx, tmp_path, monkeypatch):
+    import os
+    import config.settings as settings
+    from agents.simulation.cache import SimulationCache, simulation_key
+    cache = SimulationCache(tmp_path, memory_entries=1, disk_entries=1, ttl=60)
+    first = cache.simulate(ctx, iterations=300)
+    assert cache.simulate(ctx, iterations=300) == first
+    assert cache.stats()["misses"] == 1 and cache.stats()["memory_hits"] == 1
+
+    # A fresh process-level cache reads the disk tier
+    fresh = SimulationCache(tmp_path, ttl=60)
+    assert fresh.simulate(ctx, iterations=300) == first and fresh.disk_hits == 1
+
+    # Disk bound evicts the oldest entry; memory bound keeps the newest only
+    cache.simulate(ctx, iterations=301)
+    assert len(list(tmp_path.glob("*.pkl"))) == 1 and len(cache._memory) == 1
+
+    key = simulation_key(ctx, iterations=301)
+    os.utime(tmp_path / f"{key}.pkl", (0, 0))
+    assert SimulationCache(tmp_path, ttl=60).get(key) is None
+
+    monkeypatch.setattr(settings, "RANDOM_SEED", 7)
+    assert simulation_key(ctx, iterations=301) != key
+
+def test_cached_simulation_honours_sampling(ctx, tmp_path, monkeypatch):
+    import agents.simulation.cache as cache
+    monkeypatch.setattr(cache, "_default_cache", cache.SimulationCache(tmp_path))
+    sobol = cache.cached_simulate_match(ctx, iterations=2000, sampling="sobol")
+    assert sobol == simulate_match(ctx, iterations=2000, sampling="sobol")
+    assert cache.cached_simulate_match(ctx, iterations=2000) == simulate_match(ctx, iterations=2000)
+    assert cache.default_cache().stats()["misses"] == 2
+
+def test_adaptive_simulation_stops_at_target_se(ctx):
+    from dataclasses import replace
+    lopsided = replace(ctx, venue_chase_advantage=0.35)
+    quick    = simulate_match(lopsided, iterations=20000, target_se=0.01)
+    assert quick.iterations < 20000
+    p = quick.win_prob_batting_first
+    assert (p * (1 - p) / quick.iterations) ** 0.5 <= 0.01
+
+    lines  = {6: [44.5]}
+    capped = simulate_match(ctx, lines=lines, iterations=3000, target_se=0.001, batch_size=1000)
+    assert capped.iterations == 3000 and capped.sessions[0].prob_over_line
+
+def test_sampling_modes_and_common_random_numbers(ctx):
+    from agents.simulation.monte_carlo import _UniformSource, simulate_scenarios
+    u1, u2 = np.empty((6, 120)), np.empty((6, 120))
+    _UniformSource(0, "antithetic").fill(u1, u2)
+    assert np.allclose(u1[3:], 1 - u1[:3]) and np.allclose(u2[3:], 1 - u2[:3])
+    for mode in ("antithetic", "sobol"):
+        result = simulate_match(ctx, iterations=512, sampling=mode)
+        assert 120 < result.innings1_mean < 220
+    with pytest.raises(ValueError):
+        simulate_match(ctx, iterations=10, sampling="halton")
+
+    same = simulate_scenarios([ctx, ctx], iterations=500, seed=3)
+    assert same[0] == same[1] == simulate_match(ctx, iterations=500, seed=3)
+    indep = simulate_scenarios([ctx, ctx], iterations=500, seed=3, common_random_numbers=False)
+    assert indep[0] != indep[1]
+
+def test_exact_engine_agrees_with_sampling(ctx):
+    from agents.simulation.exact import exact_match
+    lines   = {6: [44.5], 20: [160.5]}
+    exact   = exact_match(ctx, lines)
+    sampled = simulate_match(ctx, lines=lines, iterations=40000)
+    assert exact == exact_match(ctx, lines) and exact.iterations == 0
+    assert abs(exact.win_prob_batting_first - sampled.win_prob_batting_first) < 0.015
+    assert abs(exact.innings1_mean - sampled.innings1_mean) < 0.5
+    for e, s in zip(exact.sessions, sampled.sessions):
+        assert abs(sum(e.wickets_pmf) - 1) < 1e-9
+        assert abs(e.mean_runs - s.mean_runs) < 0.5 and abs(e.std_runs - s.std_runs) < 0.5
+        for line, prob in e.prob_over_line.items():
+            assert abs(prob - s.prob_over_line[line]) < 0.015
+
+def test_exact_sampling_mode_is_memoised(ctx, tmp_path, monkeypatch):
+    import agents.simulation.cache as cache
+    from agents.simulation.exact import _profile_pmfs, exact_match
+    from agents.simulation.monte_carlo import simulate_matches
+    monkeypatch.setattr(cache, "_default_cache", cache.SimulationCache(tmp_path))
+    lines = {6: [44.5]}
+    hits  = _profile_pmfs.cache_info().hits
+    exact = simulate_match(ctx, lines=lines, sampling="exact")
+    assert exact == exact_match(ctx, lines) and exact.iterations == 0
+    assert _profile_pmfs.cache_info().hits >= hits + 1
+    assert simulate_matches([ctx], lines=lines, sampling="exact") == [exact]
+    assert cache.cached_simulate_match(ctx, lines=lines, sampling="exact") == exact
+
+def test_streamed_simulation_summarises_from_histograms(ctx):
+    from agents.simulation.distribution import ScoreDistribution
+    scores = np.random.default_rng(1).integers(100, 220, size=5001)
+    dist   = ScoreDistribution.from_scores(scores)
+    assert dist.mean == pytest.approx(scores.mean()) and dist.std == pytest.approx(scores.std())
+    assert dist.prob_over(160.5) == np.mean(scores > 160.5)
+    assert dist.quantile(0.5) == np.percentile(scores, 50, method="inverted_cdf")
+
+    # Blocks of 250 paths: memory is bounded by max_cells, not iterations
+    streamed = simulate_match(ctx, lines={20: [160.5]}, iterations=3000, max_cells=250 * 120)
+    assert streamed.iterations == 3000 and streamed.innings1_distribution.total == 3000
+    final = streamed.sessions[-1]
+    assert final.distribution == streamed.innings1_distribution
+    assert final.prob_over_line[160.5] == final.distribution.prob_over(160.5)
+    assert abs(streamed.innings1_mean - simulate_match(ctx, iterations=3000).innings1_mean) < 2
+
+def test_sharded_simulation_is_reproducible_across_workers(ctx):
+    from agents.simulation.monte_carlo import simulate_matches
+    other  = build_match_context("Eden Gardens","KKR","RCB","KKR","bat","night","league_mid")
+    serial = simulate_match(ctx, iterations=1001, shards=4)
+    assert serial.iterations == 1001
+    assert simulate_match(ctx, iterations=1001, shards=4, workers=2) == serial
+    assert simulate_match(ctx, iterations=1001, shards=3) != serial
+
+    slate = simulate_matches([ctx, other], iterations=600, seeds=[5, 6], shards=2, workers=2)
+    assert slate[0] == simulate_match(ctx, iterations=600, seed=5, shards=2)
+    assert slate[1] == simulate_match(other, iterations=600, seed=6, shards=2)
+
+def test_win_surface_interpolates_exact_engine(ctx, tmp_path):
+    from agents.simulation.exact import exact_match
+    from agents.simulation.surface import WinSurface, build_surface
+    surface = build_surface({ctx.venue: ctx.venue_avg_powerplay}, grid=np.arange(120.0, 241.0, 10.0))
+    surface.save(tmp_path / "surface.npz")
+    loaded  = WinSurface.load(tmp_path / "surface.npz")
+    assert loaded.covers(ctx) and not loaded.covers(build_match_context(
+        "Eden Gardens","KKR","RCB","KKR","bat","night","league_mid"))
+    assert 0 < loaded.max_error[0] < 0.02
+    fast, exact = loaded.match(ctx), exact_match(ctx)
+    assert abs(fast.win_prob_batting_first - exact.win_prob_batting_first) < 0.01
+    for f, e in zip(fast.sessions, exact.sessions):
+        assert abs(f.mean_runs - e.mean_runs) <= 1
+        assert abs(fast.prob_over(f.over, e.mean_runs) - exact.prob_over(f.over, e.mean_runs)) < 0.03
+    assert abs(fast.quantile(20, 0.5, innings=2) - exact.quantile(20, 0.5, innings=2)) <= 2
+    assert fast.with_lines({20: [160.5]}).sessions[-1].prob_over_line[160.5] == fast.prob_over(20, 160.5)
+
+def test_chase_table_matches_exact_innings_distribution(ctx):
+    from agents.simulation.chase import chase_table_for
+    from agents.simulation.exact import innings_pmfs
+    from agents.simulation.monte_carlo import _match_rates
+    run_means, wicket_probs = _match_rates(ctx)[1]
+    table = chase_table_for(ctx)
+    assert chase_table_for(ctx) is table
+    # From the first ball the chase wins iff it scores >= target - 1 (ties go to the chase)
+    final = innings_pmfs(run_means[None], wicket_probs[None], checkpoints=[20])[20][0].sum(axis=0)
+    for target in (140, 170, 200):
+        assert table.win_prob(target, 120, 10) == pytest.approx(final[target - 1:].sum(), abs=1e-6)
+    assert table.win_prob(0, 5, 1) == 1.0 and table.win_prob(8, 1, 4) == 0.0
+    assert table.win_prob(30, 18, 6) > table.win_prob(30, 18, 2) > table.win_prob(40, 18, 2)
+    assert table.win_prob(30, 24, 6) > table.win_prob(30, 18, 6)
+
+def test_chase_match_prices_from_the_table(ctx):
+    from agents.simulation.chase import chase_match, chase_table_for
+    sim = chase_match(ctx, 120, 4, 30, 171)
+    assert sim.win_prob_batting_second == round(chase_table_for(ctx).win_prob(51, 30, 6), 4)
+    assert sim.iterations == 0 and sim.innings1_mean == 170 and sim.quantile(20, 0.5) == 170
+
+def test_live_simulation_resumes_from_ball_state(ctx):
+    from agents.simulation.monte_carlo import LiveState, simulate_live, _live_rates
+    start = simulate_live(ctx, LiveState(1, 0, 0, 0), iterations=2000, seed=4)
+    full  = simulate_match(ctx, iterations=2000, seed=4)
+    assert start.win_prob_batting_first == full.win_prob_batting_first
+    assert [s.distribution for s in start.sessions] == [s.distribution for s in full.sessions]
+
+    hits = _live_rates.cache_info().hits
+    mid  = simulate_live(ctx, LiveState(1, 100, 2, 72), iterations=2000)
+    assert _live_rates.cache_info().hits == hits + 1
+    assert [s.over for s in mid.sessions] == [15, 20] and mid.sessions[0].distribution.prob_over(99.5) == 1
+    all_out = simulate_live(ctx, LiveState(1, 95, 10, 80), iterations=500)
+    assert all_out.innings1_std == 0 and all_out.innings1_mean == 95
+    assert simulate_live(ctx, LiveState(2, 150, 3, 90, target=150), iterations=200).win_prob_batting_second == 1
+    assert simulate_live(ctx, LiveState(2, 100, 10, 90, target=150), iterations=200).win_prob_batting_second == 0
+    with pytest.raises(ValueError):
+        simulate_live(ctx, LiveState(2, 100, 3, 90))
+
+def test_live_simulation_clips_scores_past_max_runs(ctx):
+    from agents.simulation.monte_carlo import MAX_RUNS, LiveState, simulate_live
+    late = simulate_live(ctx, LiveState(1, 715, 0, 114), iterations=500)
+    assert late.innings1_distribution.total == 500 and late.innings1_mean > 715
+    assert simulate_live(ctx, LiveState(1, 725, 0, 114), iterations=200).innings1_mean == MAX_RUNS
+    assert late.win_prob_batting_first > 0.99
+    chase = simulate_live(ctx, LiveState(2, 730, 0, 114, target=800), iterations=200)
+    assert chase.win_prob_batting_second < 0.01
+
+def test_simulation_result_answers_any_line(sim):
+    from dashboard.checkpoint_predictor import checkpoint_distributions, simulate_from_here
+    session = sim.sessions[1]
+    assert sim.prob_over(session.over, 70.5) == session.distribution.prob_over(70.5)
+    assert sim.prob_between(20, 150.5, 170.5) == pytest.approx(
+        sim.prob_over(20, 150.5) - sim.prob_over(20, 170.5))
+    assert sim.quantile(20, 0.1) <= sim.quantile(20, 0.5) <= sim.quantile(20, 0.9)
+    assert sim.quantile(20, 0.5, innings=2) == sim.innings2_distribution.quantile(0.5)
+    with pytest.raises(ValueError):
+        sim.prob_over(7, 50.5)
+    priced = sim.with_lines({6: [44.5, 50.5]})
+    assert priced.sessions[0].prob_over_line == {44.5: sim.prob_over(6, 44.5),
+                                                 50.5: sim.prob_over(6, 50.5)}
+    assert priced.win_prob_batting_first == sim.win_prob_batting_first
+
+    results = simulate_from_here(54, 1, 6.0, np.random.default_rng(0), iterations=2000)
+    dists   = checkpoint_distributions(results)
+    assert sorted(dists) == [6, 10, 15, 20] and dists[20].prob_over(170.5) == np.mean(results[:, -1] > 170.5)
+
+def test_scan_ev_prices_a_multi_bookmaker_book(sim):
+    from agents.market_edge.ev_detector import BOOK_COLUMNS, best_prices, ev_signals, scan_ev
+    book = pd.DataFrame([
+        ("a", "match_winner", "team_batting_first",  np.nan, np.nan, 4.0),
+        ("b", "match_winner", "team_batting_first",  np.nan, np.nan, 4.5),
+        ("a", "match_winner", sim.team_batting_second, np.nan, np.nan, 1.01),
+        ("a", "session_runs", "over",                20,     160.5,  1.9),
+        ("b", "session_runs", "under",               20,     160.5,  1.9),
+        ("b", "session_runs", "over",                7,      50.5,   1.9),
+        ("b", "exotic",       "anything",            np.nan, np.nan, 3.0),
+    ], columns=BOOK_COLUMNS)
+    scan = scan_ev(sim, book)
+    assert scan["model_prob"][0] == sim.win_prob_batting_first == scan["model_prob"][1]
+    assert scan["model_prob"][2] == sim.win_prob_batting_second
+    assert scan["model_prob"][3] + scan["model_prob"][4] == pytest.approx(1.0)
+    assert scan["model_prob"][3] == sim.prob_over(20, 160.5)
+    assert scan[["model_prob"]].iloc[5:].isna().all().all() and not scan["signal"][5:].any()
+    assert list(scan["strength"][:2]) == ["strong", "strong"] and not scan["signal"][2]
+    assert list(scan["best_price"][:2]) == [False, True]
+    best = best_prices(book)
+    assert best.loc[("match_winner", np.nan, np.nan, "team_batting_first"), "bookmaker"] == "b"
+
+    report = detect_ev(sim, "MI vs CSK", {"match_winner": {"team_batting_first": 4.5}})
+    assert report.signals == ev_signals(sim, scan.iloc[[1]])
+
+def test_odds_book_ticks_emit_only_signal_changes(sim):
+    from agents.market_edge.ev_detector import model_probabilities, odds_book, scan_ev
+    from agents.market_edge.odds_book import OddsBook
+    priced = sim.with_lines({20: [160.5, 170.5]})
+    rows   = odds_book(priced, {"match_winner": {"team_batting_first": 1.2, "team_batting_second": 1.2},
+                                "session_runs": {20: {"over": 1.9, "under": 1.9}}})
+    book   = OddsBook(rows)
+    events = book.reprice(model_probabilities(priced, book.book))
+    assert book.scan().equals(scan_ev(priced, rows))
+    assert {e.kind for e in events} == {"appeared"} and len(events) == book.scan()["signal"].sum()
+
+    first = sim.win_prob_batting_first
+    assert book.tick("match_winner", "team_batting_first", 1.0 / first + 0.01) == []
+    moved = book.tick("match_winner", "team_batting_first", 1.0 / (first - 0.05))
+    assert [(e.kind, e.strength) for e in moved] == [("appeared", "moderate")]
+    moved = book.tick("match_winner", "team_batting_first", 1.0 / (first - 0.10))
+    assert [(e.kind, e.previous, e.strength) for e in moved] == [("changed", "moderate", "strong")]
+    assert book.tick("match_winner", "team_batting_first", 1.01)[0].kind == "disappeared"
+    assert book.scan().equals(scan_ev(priced, rows.assign(odds=book.odds)))
+    assert book.reprice(book.model) == []